@@ -10,7 +10,8 @@ from app.api.endpoints import (
     project,
     assignment,
     announcement, 
-    calendar
+    calendar,
+    metrics
 )
 
 api_router = APIRouter()
@@ -73,4 +74,10 @@ api_router.include_router(
     calendar.calendar_router,
     prefix="/calendar",
     tags=["calendar"]
+)
+
+api_router.include_router(
+    metrics.metrics_router,
+    prefix="/metrics",
+    tags=["metrics"]
 )
\ No newline at end of file
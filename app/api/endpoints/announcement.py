@@ -1,23 +1,59 @@
-from typing import Any
+import asyncio
+from typing import Any, AsyncIterator
 from datetime import date
+from zoneinfo import ZoneInfo
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
 
 from app import internal, schemas
+from app.api.responses import event_stream_response
+from app.config import settings
+from app.db.cursor import CURSOR_PREFETCH
 from app.internal.announcement_crud import announcement
+from app.internal.CRUD.query_params import MAX_PAGE_SIZE, InvalidQueryParam
 from app.core.auth.role_checker import allow_clevel
 
 announcements_router = APIRouter()
 
 
+def announcements_page(
+    response: Response,
+    announcements: list[dict],
+    limit: int | None,
+    cursor: str | None
+    ) -> list[dict]:
+    """Send the cursor of the page that follows "announcements" in the
+    "X-Next-Cursor" header.
+    """
+    next_cursor = announcement.next_cursor(announcements, limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if len(announcements) == 0 and cursor is None:
+        raise HTTPException(
+                400,
+                detail=f"No announcements found"
+            )
+    return announcements
+
+
 @announcements_router.get(
     "/today",
     response_model= list[schemas.Announcement],
     name="Get all the announcements from today"
 )
-async def announcements_today(current_user=Depends(allow_clevel)) -> Any:
+async def announcements_today(
+    response: Response,
+    tz: ZoneInfo = Depends(internal.timezone_params),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
+    current_user=Depends(allow_clevel)
+    ) -> Any:
     """
-    Get all "announcement" entities created current day.
+    Get all "announcement" entities created current day in the time zone
+    "tz" (UTC by default), sorted by date.
+    Supports keyset pagination with the "limit" and "cursor" query
+    parameters: when more entries are available, the response has an
+    "X-Next-Cursor" header to pass as "cursor" to get the next page.
     Allowed for "C-LEVEL"
     The return of the api has a following scheme:
     ```json
@@ -26,40 +62,119 @@ async def announcements_today(current_user=Depends(allow_clevel)) -> Any:
         "name": "The collaborators of a project have been modified",
         "description": "The user:guane has added collaborator:Diego to the project:Avigail",
         "id": 1,
-        "user_id": 1
+        "user_id": 1,
+        "date": "2023-02-13T15:04:12.382000+00:00"
     },
     {
         "name": "The collaborators of a project have been modified",
-        "description": "The user:guane has eliminated collaborator:Andres to the project:Avigail",
+        "description": "The user:guane has removed collaborator:Andres from the project:Avigail",
         "id": 2,
-        "user_id": 1
+        "user_id": 1,
+        "date": "2023-02-13T15:06:40.113000+00:00"
     }...
     ]
     ```
     """
-    announcements = await announcement.today_announcement()
-    if len(announcements) != 0:
-            return announcements
-    else:
-        raise HTTPException(
-                400,
-                detail=f"No announcements found"
+    try:
+        announcements = await announcement.today_announcement(
+            tz,
+            limit=limit,
+            cursor=cursor
+        )
+    except InvalidQueryParam as e:
+        raise HTTPException(400, detail=str(e))
+    return announcements_page(response, announcements, limit, cursor)
+
+
+
+async def announcement_events(last_id: int | None) -> AsyncIterator[dict | None]:
+    """Announcements created after the id "last_id", followed by the ones
+    published while the stream is open. None is produced when no
+    announcement was published for ANNOUNCEMENT_STREAM_HEARTBEAT seconds.
+    The stream ends if the client falls behind by more than
+    ANNOUNCEMENT_STREAM_QUEUE_SIZE announcements.
+    """
+    # Subscribe before reading the missed announcements so none is lost in
+    # between, then skip the published ones that were already replayed
+    subscription = announcement.broadcaster.subscribe()
+    try:
+        replayed_id = last_id
+        while replayed_id is not None:
+            missed = await announcement.announcements_after(
+                replayed_id,
+                CURSOR_PREFETCH
             )
-            
+            for announcement_data in missed:
+                replayed_id = announcement_data["id"]
+                yield announcement_data
+            if len(missed) < CURSOR_PREFETCH:
+                break
+        while not (subscription.overflowed and subscription.queue.empty()):
+            try:
+                announcement_data = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    settings.ANNOUNCEMENT_STREAM_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if replayed_id is None or announcement_data["id"] > replayed_id:
+                yield announcement_data
+    finally:
+        announcement.broadcaster.unsubscribe(subscription)
+
 
 @announcements_router.get(
-    "/{start_date}/{final_date}}",
+    "/stream",
+    name="Stream the new announcements"
+)
+async def announcements_stream(
+    last_event_id: int | None = Header(None, alias="Last-Event-ID"),
+    current_user=Depends(allow_clevel)
+    ) -> Any:
+    """
+    Stream the "announcement" entities as server-sent events of type
+    "announcement", as soon as they are created. Each event id is the id
+    of the announcement: when the "Last-Event-ID" header is sent, the
+    announcements created after that id are sent first, so a client that
+    reconnects does not miss any. Idle streams get a ": ping" comment
+    every ANNOUNCEMENT_STREAM_HEARTBEAT seconds.
+    Allowed for "C-LEVEL"
+    The return of the api has a following scheme:
+    ```
+    id: 1
+    event: announcement
+    data: {"id": 1, "name": "The collaborators of a project have been modified", "description": "The user:guane has added collaborator:Diego to the project:Avigail", "user_id": 1, "date": "2023-02-13T15:04:12.382000+00:00"}
+
+    ```
+    """
+    return event_stream_response(
+        announcement_events(last_event_id),
+        "announcement"
+    )
+
+
+@announcements_router.get(
+    "/{start_date}/{final_date}",
     response_model= list[schemas.Announcement],
     name="Get announcements between dates"
 )
-async def announcements_today(
+async def announcements_between_dates(
     start_date:date,
     final_date:date,
+    response: Response,
+    tz: ZoneInfo = Depends(internal.timezone_params),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
     current_user=Depends(allow_clevel)
     ) -> Any:
     """
-    Get all "announcement" entities created in the range
-    between start_date and final_date.
+    Get all "announcement" entities created from the start of start_date
+    to the end of final_date in the time zone "tz" (UTC by default),
+    sorted by date.
+    Supports keyset pagination with the "limit" and "cursor" query
+    parameters: when more entries are available, the response has an
+    "X-Next-Cursor" header to pass as "cursor" to get the next page.
     Allowed for "C-LEVEL"
     The return of the api has a following scheme:
     ```json
@@ -68,25 +183,32 @@ async def announcements_today(
         "name": "The collaborators of a project have been modified",
         "description": "The user:guane has added collaborator:Diego to the project:Avigail",
         "id": 1,
-        "user_id": 1
+        "user_id": 1,
+        "date": "2023-02-13T15:04:12.382000+00:00"
     },
     {
         "name": "The collaborators of a project have been modified",
-        "description": "The user:guane has eliminated collaborator:Andres to the project:Avigail",
+        "description": "The user:guane has removed collaborator:Andres from the project:Avigail",
         "id": 2,
-        "user_id": 1
+        "user_id": 1,
+        "date": "2023-02-14T09:30:02.947000+00:00"
     }...
     ]
     ```
     """
-    announcements = await announcement.announcements_between_dates(
-        start_date,
-        final_date
-    )
-    if len(announcements) != 0:
-            return announcements
-    else:
+    if final_date < start_date:
         raise HTTPException(
-                400,
-                detail=f"No announcements found"
-            )
\ No newline at end of file
+            400,
+            detail="final_date must be greater than or equal to start_date"
+        )
+    try:
+        announcements = await announcement.announcements_between_dates(
+            start_date,
+            final_date,
+            tz,
+            limit=limit,
+            cursor=cursor
+        )
+    except InvalidQueryParam as e:
+        raise HTTPException(400, detail=str(e))
+    return announcements_page(response, announcements, limit, cursor)
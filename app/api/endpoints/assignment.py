@@ -1,10 +1,12 @@
 from typing import Any
 
-from fastapi import APIRouter, status, Depends, HTTPException
+from fastapi import APIRouter, status, Depends, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
 
 from app import internal, schemas
 from app.internal.assignment_crud import assignment
-from app.core.auth.role_checker import allow_clevel_leader
+from app.core.auth.role_checker import allow_clevel, allow_clevel_leader
+from app.api.responses import NDJSONResponse, ndjson_response
 
 
 assignments_router = APIRouter()
@@ -18,13 +20,24 @@ assignment_web_crud = internal.WebCRUDWrapper(
 @assignments_router.get(
     "/",
     response_model= list[schemas.Assignment],
+    response_model_exclude_unset=True,
     name="List all assignments"
 )
-async def get_assignments(current_user=Depends(allow_clevel_leader)) -> Any:
+async def get_assignments(
+    response: Response,
+    page: internal.Page = Depends(internal.page_params),
+    fields: list[str] | None = Depends(internal.fields_params),
+    current_user=Depends(allow_clevel_leader)
+    ) -> Any:
     """
     Get a list of all "assignment" entities. Allowed for "C-LEVEL" AND 
     "LEADER".
     Allowed for "C-LEVEL" AND "LEADER"
+    Supports keyset pagination with the "limit", "cursor" and "order_by"
+    query parameters: when more entries are available, the response has
+    an "X-Next-Cursor" header to pass as "cursor" to get the next page.
+    "fields" (e.g. "id,name") limits the fields read from the database
+    and returned for each entry.
     The return of the api has a following scheme:
     ```json
     [
@@ -47,21 +60,56 @@ async def get_assignments(current_user=Depends(allow_clevel_leader)) -> Any:
     ]
     ``` 
     """
-    return await assignment_web_crud.get_all_entries()
+    return await assignment_web_crud.get_all_entries(page, response, fields)
+
+
+@assignments_router.get(
+    "/overallocation",
+    response_class=NDJSONResponse,
+    responses={200: {
+        "model": schemas.Overallocation,
+        "description": "One collaborator per line"
+    }},
+    name="Overallocation report"
+)
+async def overallocation_report(current_user=Depends(allow_clevel)) -> Any:
+    """
+    Report of every collaborator booked on overlapping assignments,
+    streamed as newline delimited JSON (one collaborator per line).
+    "conflicts" is the number of assignments that start while an earlier
+    one of the same collaborator is still running and "overlap_days" the
+    number of days covered by two or more assignments.
+    Allowed for "C-LEVEL".
+    Each line of the response has a following scheme:
+    ```json
+    {
+    "collaborator_id": 1,
+    "conflicts": 2,
+    "overlap_days": 6,
+    "first_overlap": "2023-02-16",
+    "last_overlap": "2023-02-27"
+    }
+    ```
+    """
+    return ndjson_response(assignment.overallocation_report())
 
 
 @assignments_router.get(
     "/{assignment_id}",
     response_model= schemas.Assignment,
+    response_model_exclude_unset=True,
     name="Assignment info by id"
 )
 async def get_assignment_id(
     assignment_id:int,
+    fields: list[str] | None = Depends(internal.fields_params),
     current_user=Depends(allow_clevel_leader)
     ) -> Any:
     """
     Read one "assignmment" entity based on its id.
     Allowed for "C-LEVEL" and "LEADER".
+    "fields" (e.g. "id,name") limits the fields read from the database
+    and returned.
     The return of the api has a following scheme:
     ```json
     {
@@ -74,7 +122,7 @@ async def get_assignment_id(
     }
     ```
     """
-    return await assignment_web_crud.get_enty_by_field("id", assignment_id)
+    return await assignment_web_crud.get_enty_by_field("id", assignment_id, fields)
 
 
 @assignments_router.post(
@@ -88,7 +136,9 @@ async def create_assignment(
     ) -> Any:
     """
     Create one "assignment" entity. In order to create the "assignment",
-    the collaborator must be added to the corresponding project.
+    the collaborator must be added to the corresponding project and must
+    not have other assignments in the same dates. Otherwise an HTTP 409
+    is returned with the conflicting assignments in "conflicts".
     Allowed for "C-LEVEL" and "LEADER".
     The return of the api has a following scheme:
     ```json
@@ -111,6 +161,14 @@ async def create_assignment(
             500,
             detail="The collaborator is not assigned to the project"
         )
+    except internal.AssignmentOverlap as e:
+        raise HTTPException(
+            409,
+            detail={
+                "message": str(e),
+                "conflicts": jsonable_encoder(e.conflicts)
+            }
+        )
     except Exception as e:
         raise HTTPException(
             500,
@@ -127,6 +185,111 @@ async def create_assignment(
     return create_assignment
 
 
+@assignments_router.post(
+    "/bulk",
+    response_model=list[schemas.Assignment],
+    name="Create many assignments",
+    status_code=status.HTTP_201_CREATED
+)
+async def create_assignments_bulk(
+    assignments_in: list[schemas.AssignmentCreate],
+    current_user=Depends(allow_clevel_leader)
+    ) -> Any:
+    """
+    Create many "assignment" entities in one transaction: either all of them
+    are created or none. All the assignments are checked like on the single
+    create. If some of them fail, HTTP 409 is returned with one entry per
+    rejected assignment in "conflicts", with its "index" in the batch.
+    Allowed for "C-LEVEL" and "LEADER".
+    The return of the api is the list of created entities, in the order
+    they were sent:
+    ```json
+    [
+    {
+    "name": "task1",
+    "start_date": "2023-02-13",
+    "final_date": "2023-02-20",
+    "id": 1,
+    "collaborator_id": 1,
+    "project_id": 1
+    }...
+    ]
+    ```
+    """
+    return await assignment_web_crud.post_bulk(
+        enties_info=assignments_in
+    )
+
+
+@assignments_router.patch(
+    "/bulk",
+    response_model=list[schemas.Assignment],
+    name="Update many assignments by id"
+)
+async def update_assignments_bulk(
+    assignment_update: schemas.AssignmentUpdate,
+    ids: list[int] = Depends(internal.ids_params),
+    current_user=Depends(allow_clevel_leader)
+    ) -> Any:
+    """
+    Update every "assignment" entity in "ids" (e.g. "?ids=1&ids=2") with
+    the same values, in a single statement.
+    When the dates change, the assignments are checked against the other
+    assignments of their collaborators and against each other. If some
+    of them overlap, nothing is updated and HTTP 409 is returned with
+    one entry per rejected assignment "id" in "conflicts".
+    Allowed for "C-LEVEL" and "LEADER".
+    The return of the api is the list of updated entities, ids that do not
+    exist are left out:
+    ```json
+    [
+    {
+    "name": "task1",
+    "start_date": "2023-02-13",
+    "final_date": "2023-02-20",
+    "id": 1,
+    "collaborator_id": 1,
+    "project_id": 1
+    }...
+    ]
+    ```
+    """
+    return await assignment_web_crud.update_bulk(
+        ids=ids,
+        enty_new_info=assignment_update
+    )
+
+
+@assignments_router.delete(
+    "/bulk",
+    response_model=list[schemas.Assignment],
+    name="Delete many assignments by id"
+)
+async def delete_assignments_bulk(
+    ids: list[int] = Depends(internal.ids_params),
+    current_user=Depends(allow_clevel_leader)
+    ) -> Any:
+    """
+    Delete every "assignment" entity in "ids" (e.g. "?ids=1&ids=2"), in a
+    single statement. Allowed for "C-LEVEL" and "LEADER".
+    The return of the api is the list of deleted entities, ids that do not
+    exist are left out:
+    ```json
+    [
+    {
+    "name": "task1",
+    "start_date": "2023-02-13",
+    "final_date": "2023-02-20",
+    "id": 1,
+    "collaborator_id": 1,
+    "project_id": 1
+    }...
+    ]
+    ```
+    """
+    return await assignment_web_crud.delete_bulk(ids=ids)
+
+
 @assignments_router.patch(
     "/{assignment_id}",
     response_model = schemas.Assignment,
@@ -138,17 +301,19 @@ async def update_assignment_by_id(
     current_user=Depends(allow_clevel_leader)
 ):
     """
-    Update one "assignment" entity by id. Allowed for "C-LEVEL" and
-    "LEADER"
+    Update one "assignment" entity by id. If the new dates overlap other
+    assignments of the collaborator, an HTTP 409 is returned with the
+    conflicting assignments in "conflicts".
+    Allowed for "C-LEVEL" and "LEADER"
     The return of the api has a following scheme:
     ```json
     {
     "name": "task_easy",
-    "start_date": null,
-    "final_date": null,
-    "id": null,
-    "collaborator_id": null,
-    "project_id": null
+    "start_date": "2023-02-13",
+    "final_date": "2023-02-20",
+    "id": 1,
+    "collaborator_id": 1,
+    "project_id": 1
     }
     (In this example only the name was updated)
     ```
@@ -1,8 +1,10 @@
 from typing import Any
+from datetime import date
 
 from fastapi import APIRouter, status, Depends, HTTPException
 
 from app import internal, schemas
+from app.api.responses import ndjson_response
 from app.internal.calendar import assignment_calendar
 from app.core.auth.role_checker import allow_clevel
 
@@ -15,13 +17,17 @@ calendar_router = APIRouter()
     name="Calendar"
 )
 async def calendar(
-    start_filter, 
-    final_filter,
+    start_filter: date,
+    final_filter: date,
+    stream: schemas.CalendarStream | None = None,
     current_user=Depends(allow_clevel)
     ) -> Any:
     """
     * "start_filter": Start date to filter assignments
     * "final_filter": Final date to filter assignments
+    * "stream": Optional. With "ndjson" the response is streamed with one
+    project group per line (application/x-ndjson) as soon as each
+    project is read from the database.
     :return: List of assignments that are valid during the date
     range between the start_date and final_date parameters.
     Assignments will be grouped by project, by job, and by
@@ -86,9 +92,65 @@ async def calendar(
     ]
     ```
     """
+    if stream == schemas.CalendarStream.NDJSON:
+        return ndjson_response(
+            assignment_calendar.calendar_stream(start_filter, final_filter)
+        )
+
     return await assignment_calendar.calendar(
         start_filter,
         final_filter
     )
 
 
+
+
+
+@calendar_router.get(
+    "/heatmap",
+    response_model=schemas.Heatmap,
+    name="Occupancy heatmap"
+)
+async def heatmap(
+    start_date: date,
+    final_date: date,
+    group_by: schemas.HeatmapGroupBy | None = None,
+    current_user=Depends(allow_clevel)
+    ) -> Any:
+    """
+    Number of collaborators booked on each day between start_date and
+    final_date (both included). With "group_by" equal to "job" or
+    "project" one series is returned for each job or project with
+    assignments in the range. A collaborator with overlapping assignments
+    is counted once per day.
+    Allowed for "C-LEVEL"
+    The return of the api has a following scheme:
+    ```json
+    {
+    "start_date": "2023-02-10",
+    "final_date": "2023-02-14",
+    "group_by": "job",
+    "series": [
+        {
+        "id": 1,
+        "headcount": [2, 2, 3, 3, 1]
+        },
+        {
+        "id": 2,
+        "headcount": [0, 1, 1, 1, 1]
+        }
+    ]
+    }
+    ```
+    """
+    if final_date < start_date:
+        raise HTTPException(
+            400,
+            detail="final_date must be greater than or equal to start_date"
+        )
+
+    return await assignment_calendar.heatmap(
+        start_date,
+        final_date,
+        group_by
+    )
@@ -1,7 +1,7 @@
 from typing import Any
 from datetime import date
 
-from fastapi import APIRouter, status, Depends, HTTPException
+from fastapi import APIRouter, status, Depends, HTTPException, Query, Response
 
 from app import internal, schemas
 from app.internal.collaborator_crud import collaborator
@@ -18,12 +18,23 @@ collaborator_web_crud = internal.WebCRUDWrapper(
 @collaborators_router.get(
     "/",
     response_model= list[schemas.Collaborator],
+    response_model_exclude_unset=True,
     name="List all collaborators"
 )
-async def get_collaborators(current_user=Depends(allow_clevel_leader)) -> Any:
+async def get_collaborators(
+    response: Response,
+    page: internal.Page = Depends(internal.page_params),
+    fields: list[str] | None = Depends(internal.fields_params),
+    current_user=Depends(allow_clevel_leader)
+    ) -> Any:
     """
     Get a list of all "collaborator" entities. Allowed for "C-LEVEL"
     and "LEADER"
+    Supports keyset pagination with the "limit", "cursor" and "order_by"
+    query parameters: when more entries are available, the response has
+    an "X-Next-Cursor" header to pass as "cursor" to get the next page.
+    "fields" (e.g. "id,name") limits the fields read from the database
+    and returned for each entry.
     The return of the api has a following scheme:
     ```json
     [
@@ -48,7 +59,7 @@ async def get_collaborators(current_user=Depends(allow_clevel_leader)) -> Any:
     ]
     ``` 
     """
-    return await collaborator_web_crud.get_all_entries()
+    return await collaborator_web_crud.get_all_entries(page, response, fields)
 
 
 @collaborators_router.get(
@@ -114,15 +125,19 @@ async def count_collaborators_job(
 @collaborators_router.get(
     "/{collaborator_id}",
     response_model= schemas.Collaborator,
+    response_model_exclude_unset=True,
     name="Collaborator info by id"
 )
 async def get_collaborator_by_id(
     collaborator_id:int,
+    fields: list[str] | None = Depends(internal.fields_params),
     current_user=Depends(allow_clevel_leader)
     ) -> Any:
     """
     Read one "collaborator" entity based on its id. Allowed for
     "C-LEVEL" AND "LEADER"
+    "fields" (e.g. "id,name") limits the fields read from the database
+    and returned.
     The return of the api has a following scheme:
     ```json
     {
@@ -136,7 +151,7 @@ async def get_collaborator_by_id(
     }
     ```
     """
-    return await collaborator_web_crud.get_enty_by_field("id", collaborator_id)
+    return await collaborator_web_crud.get_enty_by_field("id", collaborator_id, fields)
 
 
 @collaborators_router.get(
@@ -225,6 +240,109 @@ async def create_collaborator(
     )
 
 
+@collaborators_router.post(
+    "/bulk",
+    response_model=list[schemas.Collaborator],
+    name="Create many collaborators",
+    status_code=status.HTTP_201_CREATED
+)
+async def create_collaborators_bulk(
+    collaborators_in: list[schemas.CollaboratorCreate],
+    current_user=Depends(allow_clevel_leader)
+    ) -> Any:
+    """
+    Create many "collaborator" entities in one transaction: either all of them
+    are created or none. Allowed for "C-LEVEL" and "LEADER".
+    When some "job_id" does not exist, HTTP 409 is returned with one entry
+    per rejected item (its "index" and "detail") in "conflicts".
+    The return of the api is the list of created entities, in the order
+    they were sent:
+    ```json
+    [
+    {
+        "name": "Diego",
+        "last_name": "Latorre",
+        "gender": "MALE",
+        "age": 24,
+        "is_active": true,
+        "job_id": 1,
+        "id": 1
+    }...
+    ]
+    ```
+    """
+    return await collaborator_web_crud.post_bulk(
+        enties_info=collaborators_in
+    )
+
+
+@collaborators_router.patch(
+    "/bulk",
+    response_model=list[schemas.Collaborator],
+    name="Update many collaborators by id"
+)
+async def update_collaborators_bulk(
+    collaborator_update: schemas.CollaboratorUpdate,
+    ids: list[int] = Depends(internal.ids_params),
+    current_user=Depends(allow_clevel)
+    ) -> Any:
+    """
+    Update every "collaborator" entity in "ids" (e.g. "?ids=1&ids=2") with
+    the same values, in a single statement.
+    Allowed for "C-LEVEL".
+    The return of the api is the list of updated entities, ids that do not
+    exist are left out:
+    ```json
+    [
+    {
+        "name": "Diego",
+        "last_name": "Latorre",
+        "gender": "MALE",
+        "age": 24,
+        "is_active": false,
+        "job_id": 1,
+        "id": 1
+    }...
+    ]
+    ```
+    """
+    return await collaborator_web_crud.update_bulk(
+        ids=ids,
+        enty_new_info=collaborator_update
+    )
+
+
+@collaborators_router.delete(
+    "/bulk",
+    response_model=list[schemas.Collaborator],
+    name="Delete many collaborators by id"
+)
+async def delete_collaborators_bulk(
+    ids: list[int] = Depends(internal.ids_params),
+    current_user=Depends(allow_clevel)
+    ) -> Any:
+    """
+    Delete every "collaborator" entity in "ids" (e.g. "?ids=1&ids=2"), in a
+    single statement. Allowed for "C-LEVEL".
+    The return of the api is the list of deleted entities, ids that do not
+    exist are left out:
+    ```json
+    [
+    {
+        "name": "Diego",
+        "last_name": "Latorre",
+        "gender": "MALE",
+        "age": 24,
+        "is_active": true,
+        "job_id": 1,
+        "id": 1
+    }...
+    ]
+    ```
+    """
+    return await collaborator_web_crud.delete_bulk(ids=ids)
+
+
 @collaborators_router.patch(
     "/{collaborator_id}",
     response_model = schemas.Collaborator,
@@ -240,13 +358,13 @@ async def update_collaborator_by_id(
     The return of the api has a following scheme:
     ```json
     {
-    "name": "null",
-    "last_name": "null",
-    "gender": "null",
+    "name": "Diego",
+    "last_name": "Latorre",
+    "gender": "MALE",
     "age": 25,
-    "is_active": null,
-    "job_id": null,
-    "id": null
+    "is_active": true,
+    "job_id": 1,
+    "id": 1
     }
     (In this example only the age was updated)
     ```
@@ -297,6 +415,7 @@ async def delete_collaborator_by_id(
 async def available_collaborators(
     job_id: int,
     date: date,
+    final_date: date | None = None,
     current_user=Depends(allow_clevel)
 ):
     """
@@ -304,6 +423,9 @@ async def available_collaborators(
     a specific day (date parameter). This can be useful for example if
     you want to know for some date something like "What backend developers
     do I have available?"
+    With the optional query parameter "final_date" the list only includes
+    the collaborators who are free for the whole window between "date"
+    and "final_date".
     The return of the api has a following scheme:
     ```json
     [
@@ -328,7 +450,122 @@ async def available_collaborators(
     ]
     ```
     """
+    if final_date is not None and final_date < date:
+        raise HTTPException(
+            400,
+            detail="final_date must be greater than or equal to date"
+        )
+
     return await collaborator.filter_availability(
         date=date,
-        job_id=job_id
-    )
\ No newline at end of file
+        job_id=job_id,
+        final_date=final_date
+    )
+
+@collaborators_router.get(
+    "/free_window/{job_id}/{date}",
+    response_model = list[schemas.CollaboratorFreeWindow],
+    name="Earliest free windows of the collaborators of a job"
+)
+async def free_windows(
+    job_id: int,
+    date: date,
+    days: int = Query(1, ge=1),
+    limit: int = Query(10, ge=1, le=100),
+    current_user=Depends(allow_clevel)
+):
+    """
+    For each collaborator of a job, finds the first date on or after
+    "date" from which they are free for "days" consecutive days, and
+    returns the "limit" earliest windows. This answers questions like
+    "When is the first backend developer free for two weeks?".
+    "final_date" is the last free day of the window, or null when the
+    collaborator has no later assignments.
+    The return of the api has a following scheme:
+    ```json
+    [
+    {
+        "id": 2,
+        "name": "Andres",
+        "last_name": "Alvarez",
+        "start_date": "2023-02-13",
+        "final_date": null
+    },
+    {
+        "id": 1,
+        "name": "Diego",
+        "last_name": "Latorre",
+        "start_date": "2023-02-21",
+        "final_date": "2023-03-09"
+    }...
+    ]
+    ```
+    """
+    return await collaborator.find_free_windows(
+        job_id=job_id,
+        after=date,
+        days=days,
+        limit=limit
+    )
+
+
+@collaborators_router.get(
+    "/availability_matrix/{start_date}/{final_date}",
+    response_model = schemas.AvailabilityMatrix,
+    response_model_exclude_none=True,
+    name="Availability of collaborators for each day of a range"
+)
+async def availability_matrix(
+    start_date: date,
+    final_date: date,
+    job_id: int | None = None,
+    department_id: int | None = None,
+    encoding: schemas.AvailabilityEncoding = schemas.AvailabilityEncoding.BITS,
+    current_user=Depends(allow_clevel)
+):
+    """
+    Availability grid of the collaborators of a job or of a department
+    (exactly one of "job_id" or "department_id" must be given) for every
+    day between start_date and final_date.
+    With encoding "bits", each collaborator has a base64 string with one
+    bit per day (most significant bit first, 1 meaning free). With
+    encoding "runs", each collaborator has a list of [offset, length] of
+    their free periods, where offset is the number of days after
+    start_date.
+    The return of the api has a following scheme:
+    ```json
+    {
+    "start_date": "2023-02-01",
+    "final_date": "2023-02-10",
+    "days": 10,
+    "encoding": "runs",
+    "collaborators": [
+        {
+        "id": 1,
+        "name": "Diego",
+        "last_name": "Latorre",
+        "free_runs": [[0, 3], [8, 2]]
+        }...
+    ]
+    }
+    ```
+    """
+    if (job_id is None) == (department_id is None):
+        raise HTTPException(
+            400,
+            detail="Exactly one of job_id or department_id is required"
+        )
+
+    if final_date < start_date:
+        raise HTTPException(
+            400,
+            detail="final_date must be greater than or equal to start_date"
+        )
+
+    return await collaborator.availability_matrix(
+        start_date,
+        final_date,
+        job_id=job_id,
+        department_id=department_id,
+        encoding=encoding
+    )
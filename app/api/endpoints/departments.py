@@ -1,6 +1,6 @@
 from typing import Any
 
-from fastapi import APIRouter, status, Depends
+from fastapi import APIRouter, status, Depends, Response
 
 from app import internal, schemas
 from app.core.auth.role_checker import allow_clevel, allow_clevel_leader
@@ -16,11 +16,22 @@ department_web_crud = internal.WebCRUDWrapper(
 @departments_router.get(
     "/",
     response_model= list[schemas.Department],
+    response_model_exclude_unset=True,
     name="List all departments"
 )
-async def get_deparments(current_user=Depends(allow_clevel)) -> Any:
+async def get_deparments(
+    response: Response,
+    page: internal.Page = Depends(internal.page_params),
+    fields: list[str] | None = Depends(internal.fields_params),
+    current_user=Depends(allow_clevel)
+    ) -> Any:
     """
     Get a list of all "department" entities. Allowed for "C-LEVEL".
+    Supports keyset pagination with the "limit", "cursor" and "order_by"
+    query parameters: when more entries are available, the response has
+    an "X-Next-Cursor" header to pass as "cursor" to get the next page.
+    "fields" (e.g. "id,name") limits the fields read from the database
+    and returned for each entry.
     The return of the api has a following scheme:
 
     ```json
@@ -39,7 +50,7 @@ async def get_deparments(current_user=Depends(allow_clevel)) -> Any:
     ]
     ``` 
     """
-    return await department_web_crud.get_all_entries()
+    return await department_web_crud.get_all_entries(page, response, fields)
 
 
 @departments_router.get(
@@ -61,15 +72,19 @@ async def count_deparments(current_user=Depends(allow_clevel)) -> Any:
 @departments_router.get(
     "/{department_id}",
     response_model= schemas.Department,
+    response_model_exclude_unset=True,
     name="Deparment info by id"
 )
 async def get_department_id(
     department_id:int,
+    fields: list[str] | None = Depends(internal.fields_params),
     current_user=Depends(allow_clevel_leader)
     ) -> Any:
     """
     Read one "department" entity based on its id.
     Allowed for "C-LEVEL" AND "LEADER".
+    "fields" (e.g. "id,name") limits the fields read from the database
+    and returned.
     The return of the api has a following scheme:
     ```json
     {
@@ -79,7 +94,7 @@ async def get_department_id(
     }
     ```
     """
-    return await department_web_crud.get_enty_by_field("id", department_id)
+    return await department_web_crud.get_enty_by_field("id", department_id, fields)
 
 
 @departments_router.post(
@@ -125,9 +140,9 @@ async def update_deparment_id(
     The return of the api has a following scheme:
     ```json
     {
-    "name": null,
+    "name": "Data science",
     "description": "Revamped data science department",
-    "id": null
+    "id": 2
     }
     ```
     (In this example only the description was updated)
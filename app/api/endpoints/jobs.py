@@ -1,6 +1,6 @@
 from typing import Any
 
-from fastapi import APIRouter, status, Depends, HTTPException
+from fastapi import APIRouter, status, Depends, HTTPException, Response
 
 from app import internal, schemas
 from app.internal.job_crud import job
@@ -17,11 +17,22 @@ job_web_crud = internal.WebCRUDWrapper(
 @jobs_router.get(
     "/",
     response_model= list[schemas.Job],
+    response_model_exclude_unset=True,
     name="List all jobs"
 )
-async def get_jobs(current_user=Depends(allow_clevel_leader)) -> Any:
+async def get_jobs(
+    response: Response,
+    page: internal.Page = Depends(internal.page_params),
+    fields: list[str] | None = Depends(internal.fields_params),
+    current_user=Depends(allow_clevel_leader)
+    ) -> Any:
     """
     Get a list of all "job" entities. Allowed for "C-LEVEL" AND "LEADER"
+    Supports keyset pagination with the "limit", "cursor" and "order_by"
+    query parameters: when more entries are available, the response has
+    an "X-Next-Cursor" header to pass as "cursor" to get the next page.
+    "fields" (e.g. "id,name") limits the fields read from the database
+    and returned for each entry.
     The return of the api has a following scheme:
 
     ```json
@@ -42,21 +53,25 @@ async def get_jobs(current_user=Depends(allow_clevel_leader)) -> Any:
     ]
     ``` 
     """
-    return await job_web_crud.get_all_entries()
+    return await job_web_crud.get_all_entries(page, response, fields)
 
 
 @jobs_router.get(
     "/{job_id}",
     response_model= schemas.Job,
+    response_model_exclude_unset=True,
     name="Job info by id"
 )
 async def get_job_id(
     job_id:int,
+    fields: list[str] | None = Depends(internal.fields_params),
     current_user=Depends(allow_clevel)
     ) -> Any:
     """
     Read one "job" entity based on its id. Allowed for "C-LEVEL" AND
     "LEADER"
+    "fields" (e.g. "id,name") limits the fields read from the database
+    and returned.
     The return of the api has a following scheme:
     ```json
     {
@@ -67,7 +82,7 @@ async def get_job_id(
     }
     ```
     """
-    return await job_web_crud.get_enty_by_field("id", job_id)
+    return await job_web_crud.get_enty_by_field("id", job_id, fields)
 
 
 @jobs_router.get(
@@ -152,6 +167,106 @@ async def create_job(
     )
 
 
+@jobs_router.post(
+    "/bulk",
+    response_model=list[schemas.Job],
+    name="Create many jobs",
+    status_code=status.HTTP_201_CREATED
+)
+async def create_jobs_bulk(
+    jobs_in: list[schemas.JobCreate],
+    current_user=Depends(allow_clevel)
+    ) -> Any:
+    """
+    Create many "job" entities in one transaction: either all of them
+    are created or none. Allowed for "C-LEVEL".
+    When some "department_id" does not exist, HTTP 409 is returned with
+    one entry per rejected item (its "index" and "detail") in "conflicts".
+    The return of the api is the list of created entities, in the order
+    they were sent:
+    ```json
+    [
+    {
+    "name": "Frontend developer",
+    "description": "Frontend managers",
+    "id": 2,
+    "department_id": 1
+    },
+    {
+    "name": "Backend developer",
+    "description": "Backend managers",
+    "id": 3,
+    "department_id": 1
+    }...
+    ]
+    ```
+    """
+    return await job_web_crud.post_bulk(
+        enties_info=jobs_in
+    )
+
+
+@jobs_router.patch(
+    "/bulk",
+    response_model=list[schemas.Job],
+    name="Update many jobs by id"
+)
+async def update_jobs_bulk(
+    job_update: schemas.JobUpdate,
+    ids: list[int] = Depends(internal.ids_params),
+    current_user=Depends(allow_clevel)
+    ) -> Any:
+    """
+    Update every "job" entity in "ids" (e.g. "?ids=1&ids=2") with
+    the same values, in a single statement.
+    Allowed for "C-LEVEL".
+    The return of the api is the list of updated entities, ids that do not
+    exist are left out:
+    ```json
+    [
+    {
+    "name": "Frontend developer",
+    "description": "Frontend managers",
+    "id": 2,
+    "department_id": 1
+    }...
+    ]
+    ```
+    """
+    return await job_web_crud.update_bulk(
+        ids=ids,
+        enty_new_info=job_update
+    )
+
+
+@jobs_router.delete(
+    "/bulk",
+    response_model=list[schemas.Job],
+    name="Delete many jobs by id"
+)
+async def delete_jobs_bulk(
+    ids: list[int] = Depends(internal.ids_params),
+    current_user=Depends(allow_clevel)
+    ) -> Any:
+    """
+    Delete every "job" entity in "ids" (e.g. "?ids=1&ids=2"), in a
+    single statement. Allowed for "C-LEVEL".
+    The return of the api is the list of deleted entities, ids that do not
+    exist are left out:
+    ```json
+    [
+    {
+    "name": "Frontend developer",
+    "description": "Frontend managers",
+    "id": 2,
+    "department_id": 1
+    }...
+    ]
+    ```
+    """
+    return await job_web_crud.delete_bulk(ids=ids)
+
+
 @jobs_router.patch(
     "/{job_id}",
     response_model = schemas.Job,
@@ -167,10 +282,10 @@ async def update_job_by_name(
     The return of the api has a following scheme:
     ```json
     {
-    "name": null,
+    "name": "Frontend developer",
     "description": "do frontend",
-    "id": null,
-    "department_id": null
+    "id": 2,
+    "department_id": 1
     }
     ```
     (In this example only the description was updated)
@@ -0,0 +1,63 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.core.cache import caches
+from app.core.security.pwd import hashing_executor
+from app.core.auth.role_checker import allow_clevel
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get(
+    "/cache",
+    name="Counters of the entity caches"
+)
+async def get_cache_metrics(current_user=Depends(allow_clevel)) -> Any:
+    """
+    Get the counters of the entity caches of this worker process, to tune
+    the ENTITY_CACHE_SIZE and ENTITY_CACHE_TTL settings.
+    Allowed for "C-LEVEL".
+    The return of the api has a following scheme:
+    ```json
+    {
+    "project": {
+        "size": 120,
+        "maxsize": 1024,
+        "ttl": 30.0,
+        "hits": 5400,
+        "misses": 600,
+        "evictions": 0,
+        "hit_ratio": 0.9
+    }...
+    }
+    ```
+    """
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+@metrics_router.get(
+    "/password_hashing",
+    name="Counters of the password hashing pool"
+)
+async def get_password_hashing_metrics(
+    current_user=Depends(allow_clevel)
+    ) -> Any:
+    """
+    Get the counters of the threads that hash and verify passwords in this
+    worker process: calls waiting in the queue, running and completed, the
+    deepest queue seen and the mean wait, to tune PASSWORD_HASH_WORKERS.
+    Allowed for "C-LEVEL".
+    The return of the api has a following scheme:
+    ```json
+    {
+    "max_workers": 4,
+    "queued": 0,
+    "running": 1,
+    "completed": 250,
+    "max_queued": 12,
+    "mean_wait_seconds": 0.04
+    }
+    ```
+    """
+    return hashing_executor.stats()
@@ -1,11 +1,11 @@
 from typing import Any
 
-from fastapi import APIRouter, status, Depends, HTTPException
+from fastapi import APIRouter, status, Depends, HTTPException, Response
 
 from app import internal, schemas
-from app.internal import project, project_collaborator_obj, announcement
+from app.internal import project, project_collaborator_obj
 from app.core.auth.role_checker import allow_clevel, allow_clevel_leader
-from app.internal.handler_announcement import InfoCollaboratorAnnouncement
+from app.internal.announcement_writer import announcement_writer
 
 projects_router = APIRouter()
 
@@ -18,12 +18,23 @@ project_web_crud = internal.WebCRUDWrapper(
 @projects_router.get(
     "/",
     response_model= list[schemas.Project],
+    response_model_exclude_unset=True,
     name="List all projects"
 )
-async def get_projects(current_user=Depends(allow_clevel_leader)) -> Any:
+async def get_projects(
+    response: Response,
+    page: internal.Page = Depends(internal.page_params),
+    fields: list[str] | None = Depends(internal.fields_params),
+    current_user=Depends(allow_clevel_leader)
+    ) -> Any:
     """
     Get a list of all "projects" entities. Allowed for "C-LEVEL" AND
     "LEADER"
+    Supports keyset pagination with the "limit", "cursor" and "order_by"
+    query parameters: when more entries are available, the response has
+    an "X-Next-Cursor" header to pass as "cursor" to get the next page.
+    "fields" (e.g. "id,name") limits the fields read from the database
+    and returned for each entry.
     The return of the api has a following scheme:
 
     ```json
@@ -47,7 +58,7 @@ async def get_projects(current_user=Depends(allow_clevel_leader)) -> Any:
     ]
     ``` 
     """
-    return await project_web_crud.get_all_entries()
+    return await project_web_crud.get_all_entries(page, response, fields)
 
 
 @projects_router.get(
@@ -181,15 +192,19 @@ async def get_assignments(
 @projects_router.get(
     "/{project_id}",
     response_model= schemas.Project,
+    response_model_exclude_unset=True,
     name="Project info by id"
 )
 async def get_project_by_id(
     project_id:int,
+    fields: list[str] | None = Depends(internal.fields_params),
     current_user=Depends(allow_clevel_leader)
     ) -> Any:
     """
     Read one "project" entity based on its id. Allowed for "C-LEVEL" AND
     "LEADER"
+    "fields" (e.g. "id,name") limits the fields read from the database
+    and returned.
     The return of the api has a following scheme:
     ```json
     {
@@ -202,7 +217,7 @@ async def get_project_by_id(
     }
     ```
     """
-    return await project_web_crud.get_enty_by_field("id", project_id)
+    return await project_web_crud.get_enty_by_field("id", project_id, fields)
 
 
 @projects_router.post(
@@ -240,15 +255,15 @@ async def create_project(
     status_code=status.HTTP_201_CREATED
 )
 async def add_collaborator(
-    project_id,
-    collaborator_id,
+    project_id: int,
+    collaborator_id: int,
     current_user=Depends(allow_clevel)
     ) -> Any:
     """
     Add collaborator to project. A collaborator can only be assigned
     once to a project, otherwise an HTTP exception 500 will be thrown.
-    After adding the collaborator, an announcement will be created with
-    this information.
+    After adding the collaborator, an announcement with this information
+    is queued and written in the background.
     Allowed for "C-LEVEL"
     The return of the api has a following scheme:
     ```json
@@ -278,25 +293,220 @@ async def add_collaborator(
             " not save"
         )
     
-    try: 
-        await announcement.create_announcement(
-            obj_in={
-                "name": await InfoCollaboratorAnnouncement.create_name(),
-                "description": await InfoCollaboratorAnnouncement.create_description
-                (
-                current_user,
-                project_id, 
-                collaborator_id,
-                "eliminated"
-                ),
-                "user_id": current_user["id"]   
-            }
+    await announcement_writer.submit(
+        current_user,
+        project_id,
+        collaborator_id,
+        "added"
+    )
+    return new_collaborator
+
+
+@projects_router.post(
+    "/{project_id}/collaborators",
+    response_model=list[schemas.MembershipResult],
+    name="Add many collaborators to project"
+)
+async def add_collaborators(
+    project_id: int,
+    ids: list[int] = Depends(internal.ids_params),
+    current_user=Depends(allow_clevel)
+    ) -> Any:
+    """
+    Add the collaborators with the ids in "ids" to the project in a single
+    statement. Each id gets its outcome: "added", "already_member" or
+    "not_found" when the collaborator does not exist. A single
+    announcement of the added collaborators is queued and written in the
+    background.
+    Allowed for "C-LEVEL"
+    The return of the api has a following scheme:
+    ```json
+    [
+    {
+        "collaborator_id": 2,
+        "status": "added"
+    },
+    {
+        "collaborator_id": 3,
+        "status": "already_member"
+    }...
+    ]
+    ```
+    """
+    await project_web_crud.get_enty_by_field("id", project_id, ["id"])
+    try:
+        results = await project_collaborator_obj.add_collaborators(
+            project_id,
+            ids
         )
     except Exception:
-        return "The collaborator was added to the project but the"\
-        " corresponding announcement could not be created."
+        raise HTTPException(
+            500,
+            detail="Error while adding collaborators to project"
+        )
 
-    return new_collaborator
+    await announcement_writer.submit_many(
+        current_user,
+        project_id,
+        [
+            result["collaborator_id"] for result in results
+            if result["status"] == "added"
+        ],
+        "added"
+    )
+    return results
+
+
+@projects_router.delete(
+    "/{project_id}/collaborators",
+    response_model=list[schemas.MembershipResult],
+    name="Remove many collaborators from project"
+)
+async def remove_collaborators(
+    project_id: int,
+    ids: list[int] = Depends(internal.ids_params),
+    current_user=Depends(allow_clevel)
+    ) -> Any:
+    """
+    Remove the collaborators with the ids in "ids" from the project in a
+    single statement. Each id gets its outcome: "removed" or "not_member".
+    A single announcement of the removed collaborators is queued and
+    written in the background.
+    Allowed for "C-LEVEL"
+    The return of the api has a following scheme:
+    ```json
+    [
+    {
+        "collaborator_id": 2,
+        "status": "removed"
+    },
+    {
+        "collaborator_id": 3,
+        "status": "not_member"
+    }...
+    ]
+    ```
+    """
+    await project_web_crud.get_enty_by_field("id", project_id, ["id"])
+    try:
+        results = await project_collaborator_obj.remove_collaborators(
+            project_id,
+            ids
+        )
+    except Exception:
+        raise HTTPException(
+            500,
+            detail="Error while removing collaborators from project"
+        )
+
+    await announcement_writer.submit_many(
+        current_user,
+        project_id,
+        [
+            result["collaborator_id"] for result in results
+            if result["status"] == "removed"
+        ],
+        "removed"
+    )
+    return results
+
+
+@projects_router.post(
+    "/bulk",
+    response_model=list[schemas.Project],
+    name="Create many projects",
+    status_code=status.HTTP_201_CREATED
+)
+async def create_projects_bulk(
+    projects_in: list[schemas.ProjectCreate],
+    current_user=Depends(allow_clevel)
+    ) -> Any:
+    """
+    Create many "project" entities in one transaction: either all of them
+    are created or none. Allowed for "C-LEVEL".
+    The return of the api is the list of created entities, in the order
+    they were sent:
+    ```json
+    [
+    {
+    "name": "Avigail",
+    "description": "About avigail",
+    "customer": "Apple",
+    "start_date": "2023-02-13",
+    "final_date": "2023-11-13",
+    "id": 1
+    }...
+    ]
+    ```
+    """
+    return await project_web_crud.post_bulk(
+        enties_info=projects_in
+    )
+
+
+@projects_router.patch(
+    "/bulk",
+    response_model=list[schemas.Project],
+    name="Update many projects by id"
+)
+async def update_projects_bulk(
+    project_update: schemas.ProjectUpdate,
+    ids: list[int] = Depends(internal.ids_params),
+    current_user=Depends(allow_clevel)
+    ) -> Any:
+    """
+    Update every "project" entity in "ids" (e.g. "?ids=1&ids=2") with
+    the same values, in a single statement.
+    Allowed for "C-LEVEL".
+    The return of the api is the list of updated entities, ids that do not
+    exist are left out:
+    ```json
+    [
+    {
+    "name": "Avigail",
+    "description": "About avigail",
+    "customer": "Apple",
+    "start_date": "2023-02-13",
+    "final_date": "2023-11-13",
+    "id": 1
+    }...
+    ]
+    ```
+    """
+    return await project_web_crud.update_bulk(
+        ids=ids,
+        enty_new_info=project_update
+    )
+
+
+@projects_router.delete(
+    "/bulk",
+    response_model=list[schemas.Project],
+    name="Delete many projects by id"
+)
+async def delete_projects_bulk(
+    ids: list[int] = Depends(internal.ids_params),
+    current_user=Depends(allow_clevel)
+    ) -> Any:
+    """
+    Delete every "project" entity in "ids" (e.g. "?ids=1&ids=2"), in a
+    single statement. Allowed for "C-LEVEL".
+    The return of the api is the list of deleted entities, ids that do not
+    exist are left out:
+    ```json
+    [
+    {
+    "name": "Avigail",
+    "description": "About avigail",
+    "customer": "Apple",
+    "start_date": "2023-02-13",
+    "final_date": "2023-11-13",
+    "id": 1
+    }...
+    ]
+    ```
+    """
+    return await project_web_crud.delete_bulk(ids=ids)
 
 
 @projects_router.patch(
@@ -314,12 +524,12 @@ async def update_project_by_id(
     The return of the api has a following scheme:
     ```json
     {
-    "name": null,
-    "description": null,
-    "customer": null,
+    "name": "Avigail",
+    "description": "About avigail",
+    "customer": "Apple",
     "start_date": "2023-02-13",
-    "final_date": null,
-    "id": null
+    "final_date": "2023-11-13",
+    "id": 1
     }
     (In this example only the start_date was updated)
     ```
@@ -373,8 +583,8 @@ async def delete_collaborator_to_project(
 ):
     """
     Remove collaborator to project by project_id and collaborator_id.
-    After removin the collaborator, an announcement will be created with
-    this information.
+    After removing the collaborator, an announcement with this information
+    is queued and written in the background.
     Allowed for "C-LEVEL"
     The return of the api has a following scheme:
     ```json
@@ -404,22 +614,10 @@ async def delete_collaborator_to_project(
                 detail="The collaborator could not be removed from the project"
             )
     
-    try: 
-        await announcement.create_announcement(
-            obj_in={
-                "name": await InfoCollaboratorAnnouncement.create_name(),
-                "description": await InfoCollaboratorAnnouncement.create_description
-                (
-                current_user,
-                project_id, 
-                collaborator_id,
-                "eliminated"
-                ),
-                "user_id": current_user["id"]    
-            }
-        )
-    except Exception:
-        return "The collaborator was added to the project but the"\
-        " corresponding announcement could not be created."
-    
+    await announcement_writer.submit(
+        current_user,
+        project_id,
+        collaborator_id,
+        "removed"
+    )
     return collaborator_delete
\ No newline at end of file
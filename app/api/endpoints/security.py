@@ -3,16 +3,31 @@ from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from jose import JWTError, jwt
 
 from app import schemas
 from app.core.auth.auth import authenticate_user
-from app.core.security.token import create_access_token
+from app.core.security.token import (
+    create_access_token,
+    create_refresh_token,
+    user_claims
+)
 from app.config import settings
+from app.internal import user, refresh_token, InvalidRefreshToken
 
 
 security_router = APIRouter()
 
 
+def create_access_token_for(user_in: dict) -> str:
+    access_token_expires = timedelta(
+        minutes=int(settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return create_access_token(
+        data=user_claims(user_in), expires_delta= access_token_expires
+    )
+
+
 @security_router.post("/", response_model=schemas.Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends()
@@ -23,20 +38,69 @@ async def login_for_access_token(
     user: guane
     password: ironparadise16
     ```
+    Along with the access token, a "refresh_token" is returned: send it
+    to /api/login/refresh to get a new access token without the password.
     """
-    user = await authenticate_user(
+    user_in = await authenticate_user(
         form_data.username,
         form_data.password
     )
-    if not user:
+    if not user_in:
         raise HTTPException(
             status_code = status.HTTP_401_UNAUTHORIZED,
             detail = "Incorrect username or password" 
         )
-    access_token_expires = timedelta(
-        minutes=int(settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    )
-    access_token = create_access_token(
-        data={"sub": user["username"]}, expires_delta= access_token_expires
+    session = await refresh_token.create_session(user_in["id"])
+    return {
+        "access_token": create_access_token_for(user_in),
+        "token_type": "bearer",
+        "refresh_token": create_refresh_token(user_in, session)
+    }
+
+
+@security_router.post("/refresh", response_model=schemas.Token)
+async def refresh_access_token(refresh_in: schemas.RefreshTokenIn) -> Any:
+    """
+    Get a new access token with the "refresh_token" of the login, without
+    checking the password again. Each refresh token can be used once: the
+    response has the refresh token to use next time. If a refresh token is
+    used twice the session is closed and the user must log in again.
+    The return of the api has a following scheme:
+    ```json
+    {
+    "access_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
+    "token_type": "bearer",
+    "refresh_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."
+    }
+    ```
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    try:
+        payload = jwt.decode(
+            refresh_in.refresh_token,
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM]
+            )
+    except JWTError:
+        raise credentials_exception
+    if payload.get("typ") != "refresh" or \
+        not payload.get("fam") or not payload.get("jti"):
+        raise credentials_exception
+
+    try:
+        session = await refresh_token.rotate(payload["fam"], payload["jti"])
+    except InvalidRefreshToken:
+        raise credentials_exception
+
+    user_in = await user.get_by_field(field="id", value=session["user_id"])
+    if not user_in:
+        raise credentials_exception
+    return {
+        "access_token": create_access_token_for(user_in),
+        "token_type": "bearer",
+        "refresh_token": create_refresh_token(user_in, session)
+    }
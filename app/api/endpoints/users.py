@@ -1,6 +1,6 @@
 from typing import Any
 
-from fastapi import APIRouter, status, Depends
+from fastapi import APIRouter, status, Depends, Response
 
 from app import internal, schemas
 from app.core.auth.role_checker import allow_clevel
@@ -16,11 +16,22 @@ user_web_crud = internal.WebCRUDWrapper(
 @users_router.get(
     "/",
     response_model= list[schemas.User],
+    response_model_exclude_unset=True,
     name="List all users"
 )
-async def get_users(current_user=Depends(allow_clevel)) -> Any:
+async def get_users(
+    response: Response,
+    page: internal.Page = Depends(internal.page_params),
+    fields: list[str] | None = Depends(internal.fields_params),
+    current_user=Depends(allow_clevel)
+    ) -> Any:
     """
     Get a list all "user" entities. Allowed for "C-LEVEL".
+    Supports keyset pagination with the "limit", "cursor" and "order_by"
+    query parameters: when more entries are available, the response has
+    an "X-Next-Cursor" header to pass as "cursor" to get the next page.
+    "fields" (e.g. "id,name") limits the fields read from the database
+    and returned for each entry.
     The return of the api has a following scheme:
 
     ```json
@@ -43,17 +54,24 @@ async def get_users(current_user=Depends(allow_clevel)) -> Any:
     ]
     ``` 
     """
-    return await user_web_crud.get_all_entries()
+    return await user_web_crud.get_all_entries(page, response, fields)
 
 
 @users_router.get(
     "/{user_id}",
     response_model= schemas.User,
+    response_model_exclude_unset=True,
     name="User info by id"
 )
-async def get_user_id(user_id:int, current_user=Depends(allow_clevel)) -> Any:
+async def get_user_id(
+    user_id:int,
+    fields: list[str] | None = Depends(internal.fields_params),
+    current_user=Depends(allow_clevel)
+    ) -> Any:
     """
     Read one "user" entity based on its id. Allowed for "C-LEVEL".
+    "fields" (e.g. "id,name") limits the fields read from the database
+    and returned.
     The return of the api has a following scheme:
     ```json
     {
@@ -65,7 +83,7 @@ async def get_user_id(user_id:int, current_user=Depends(allow_clevel)) -> Any:
     }
     ```
     """
-    return await user_web_crud.get_enty_by_field("id", user_id)
+    return await user_web_crud.get_enty_by_field("id", user_id, fields)
 
 
 @users_router.post(
@@ -113,10 +131,10 @@ async def update_user_id(
     ```json
     {
     "username": "daniel_17",
-    "email": null,
-    "role": null,
-    "id": null,
-    "department_id": null
+    "email": "daniel@guane.com.co",
+    "role": "LEADER",
+    "id": 2,
+    "department_id": 1
     }
     ```
     (In this example only the username was updated)
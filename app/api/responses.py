@@ -0,0 +1,45 @@
+import json
+from typing import AsyncIterator
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+
+class NDJSONResponse(StreamingResponse):
+    "Newline delimited JSON, used as the media type in the OpenAPI schema."
+    media_type = "application/x-ndjson"
+
+
+def ndjson_response(items: AsyncIterator) -> NDJSONResponse:
+    """Stream the items of an async iterator as newline delimited JSON,
+    one item per line, as soon as each one is produced.
+    """
+    async def lines():
+        async for item in items:
+            yield json.dumps(jsonable_encoder(item)) + "\n"
+
+    return NDJSONResponse(lines())
+
+
+def event_stream_response(
+    events: AsyncIterator[dict | None],
+    event: str
+    ) -> StreamingResponse:
+    """Stream the items of an async iterator as server-sent events of type
+    "event", using the "id" of each item as the event id so clients can
+    resume with the "Last-Event-ID" header. A None item is sent as a
+    comment that keeps idle connections open.
+    """
+    async def messages():
+        async for item in events:
+            if item is None:
+                yield ": ping\n\n"
+                continue
+            data = json.dumps(jsonable_encoder(item))
+            yield f"id: {item['id']}\nevent: {event}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        messages(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -13,7 +13,65 @@ class BaseConfig:
     SECRET_KEY = os.environ.get("SECRET_KEY")
     ALGORITHM = os.environ.get("ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES = os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES")
+    # Verified access tokens kept decoded, 0 disables the cache
+    TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", 4096))
+    # Lifetime of a login session, renewed with refresh tokens
+    REFRESH_TOKEN_EXPIRE_DAYS = int(os.environ.get("REFRESH_TOKEN_EXPIRE_DAYS", 14))
+    # "database": the user of each token is read from the database (or the
+    # user cache). "stateless": the user id and role are taken from the
+    # token claims, checked against the in-memory token versions
+    AUTH_MODE = os.environ.get("AUTH_MODE", "database")
+    # Threads that hash and verify passwords, off the event loop
+    PASSWORD_HASH_WORKERS = int(
+        os.environ.get("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1))
+    )
+    # Seconds between reads of the token versions in "stateless" mode
+    TOKEN_VERSIONS_REFRESH = float(os.environ.get("TOKEN_VERSIONS_REFRESH", 60))
 
+    'ENTITY CACHE CONFIG'
+    # Entries kept by each cached CRUD object, 0 disables the caches
+    ENTITY_CACHE_SIZE = int(os.environ.get("ENTITY_CACHE_SIZE", 1024))
+    # Seconds an entry is served before it is read again from the database
+    ENTITY_CACHE_TTL = float(os.environ.get("ENTITY_CACHE_TTL", 30))
+    # Seconds the user of a token is served from the cache. Kept short:
+    # changes made through another worker are seen after this delay
+    PRINCIPAL_CACHE_TTL = float(os.environ.get("PRINCIPAL_CACHE_TTL", 5))
+
+    'ANNOUNCEMENTS CONFIG'
+    # Announcements written together, and seconds an announcement can wait
+    # for others before it is written
+    ANNOUNCEMENT_BATCH_SIZE = int(os.environ.get("ANNOUNCEMENT_BATCH_SIZE", 100))
+    ANNOUNCEMENT_FLUSH_SECONDS = float(
+        os.environ.get("ANNOUNCEMENT_FLUSH_SECONDS", 1)
+    )
+    # Announcements waiting to be written before requests have to wait
+    ANNOUNCEMENT_QUEUE_SIZE = int(os.environ.get("ANNOUNCEMENT_QUEUE_SIZE", 10000))
+    # Seconds the membership changes of a user on a project are gathered
+    # into a single announcement, 0 gives one announcement per change
+    ANNOUNCEMENT_COALESCE_SECONDS = float(
+        os.environ.get("ANNOUNCEMENT_COALESCE_SECONDS", 10)
+    )
+    # Days announcements stay in the "announcement" table before they are
+    # moved to "announcement_archive", 0 keeps them forever. The archiving
+    # job runs every ANNOUNCEMENT_ARCHIVE_INTERVAL seconds and moves
+    # ANNOUNCEMENT_ARCHIVE_BATCH_SIZE announcements per statement
+    ANNOUNCEMENT_RETENTION_DAYS = int(
+        os.environ.get("ANNOUNCEMENT_RETENTION_DAYS", 90)
+    )
+    ANNOUNCEMENT_ARCHIVE_INTERVAL = float(
+        os.environ.get("ANNOUNCEMENT_ARCHIVE_INTERVAL", 3600)
+    )
+    ANNOUNCEMENT_ARCHIVE_BATCH_SIZE = int(
+        os.environ.get("ANNOUNCEMENT_ARCHIVE_BATCH_SIZE", 1000)
+    )
+    # Announcements a stream client can fall behind before it is closed,
+    # and seconds between keep-alive comments of idle streams
+    ANNOUNCEMENT_STREAM_QUEUE_SIZE = int(
+        os.environ.get("ANNOUNCEMENT_STREAM_QUEUE_SIZE", 1000)
+    )
+    ANNOUNCEMENT_STREAM_HEARTBEAT = float(
+        os.environ.get("ANNOUNCEMENT_STREAM_HEARTBEAT", 15)
+    )
 
 class DevelopmentConfig(BaseConfig):
     pass
@@ -25,6 +83,7 @@ class ProductionConfig(BaseConfig):
 
 class TestingConfig(BaseConfig):
     DATABASE_URL: str = os.environ.get("DATABASE_TEST_URL")
+    ENTITY_CACHE_SIZE = 0
 
 
 @lru_cache()
@@ -1,20 +1,23 @@
 from fastapi import HTTPException, Depends, status
-from jose import JWTError, jwt
+from jose import JWTError
 
 from app.schemas import TokenData
 from app.config import settings
-from app.core.security.token import oauth2_scheme
+from app.core.security.token import oauth2_scheme, decode_access_token
 from app.core.security.pwd import verify_password
+from app.core.security.revocation import token_versions
 from app.internal.user_crud import user
 
 async def authenticate_user(username:str, password:str):
+        # The password is always checked against the database
         user_to_authenticate = await user.get_by_field(
             field="username",
-            value=username
+            value=username,
+            use_cache=False
             ) 
         if not user_to_authenticate:
             return False
-        if not verify_password(password, user_to_authenticate['password']):
+        if not await verify_password(password, user_to_authenticate['password']):
             return False
         return user_to_authenticate
 
@@ -25,17 +28,31 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
             headers={"WWW-Authenticate": "Bearer"},
         )
         try:
-            payload = jwt.decode(
-                token,
-                settings.SECRET_KEY,
-                algorithms=[settings.ALGORITHM]
-                )
+            payload = decode_access_token(token)
             username: str = payload.get("sub")
-            if username is None:
+            # Refresh tokens are only valid at /api/login/refresh
+            if username is None or payload.get("typ") == "refresh":
                 raise credentials_exception
-            token_data = TokenData(username=username)
+            token_data = TokenData(
+                username=username,
+                uid=payload.get("uid"),
+                role=payload.get("role"),
+                ver=payload.get("ver")
+                )
         except JWTError:
             raise credentials_exception
+        if settings.AUTH_MODE == "stateless":
+            # Authorized from the claims: the token is valid while its
+            # version matches the current one of the user
+            if token_data.uid is None or token_data.ver is None or \
+                await token_versions.get(token_data.uid) != token_data.ver:
+                raise credentials_exception
+            return {
+                "id": token_data.uid,
+                "username": token_data.username,
+                "role": token_data.role
+                }
+        # Served from the user cache for PRINCIPAL_CACHE_TTL seconds
         current_user = await user.get_by_field(
             field="username",
             value=token_data.username
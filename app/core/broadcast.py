@@ -0,0 +1,44 @@
+import asyncio
+from typing import Any
+
+
+class Subscription:
+    """Messages published since a subscriber joined. When the subscriber
+    does not keep up and its queue fills, it is dropped: "overflowed" is
+    set and no more messages are queued, so it must catch up elsewhere
+    (e.g. from the database).
+    """
+    def __init__(self, max_queued: int) -> None:
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self.overflowed = False
+
+
+class Broadcaster:
+    """In-process publish/subscribe: every message published is queued for
+    each current subscriber. Publishing never waits, so a slow subscriber
+    cannot slow down the publisher. Only the subscribers of this worker
+    process receive the messages.
+    """
+    def __init__(self, max_queued: int) -> None:
+        self.max_queued = max_queued
+        self._subscriptions: set[Subscription] = set()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.max_queued)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def publish(self, message: Any) -> None:
+        for subscription in list(self._subscriptions):
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+                self.unsubscribe(subscription)
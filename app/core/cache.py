@@ -0,0 +1,87 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from app.config import settings
+
+# In-process caches. Each worker process keeps its own entries, so a
+# write served by another worker is only seen here once the entry
+# expires: keep the TTL short.
+
+# Caches by name, to report their counters
+caches: dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """Least recently used cache of at most "maxsize" entries that expire
+    "ttl" seconds after they were stored. Counts hits, misses and
+    evictions to tune its size and TTL.
+    """
+    def __init__(self, name: str, maxsize: int, ttl: float) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> (expiration, value), the least recently used first
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        caches[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        "The value stored for key, or 'default' when missing or expired."
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        "Store value for key, during 'ttl' seconds instead of the default."
+        if self.maxsize <= 0:
+            return
+        expiration = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expiration, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        "Remove the entry of key, if any."
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        "Remove every entry. The counters are kept."
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        "Counters of the cache, with the ratio of hits over lookups."
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else None
+        }
+
+
+def entity_cache(name: str, ttl: float | None = None) -> TTLCache | None:
+    """Cache of a CRUD object, sized from the ENTITY_CACHE_SIZE and
+    ENTITY_CACHE_TTL settings, or with its own "ttl". 'None' (no cache)
+    when the size is 0.
+    """
+    if settings.ENTITY_CACHE_SIZE <= 0:
+        return None
+    return TTLCache(
+        name,
+        settings.ENTITY_CACHE_SIZE,
+        settings.ENTITY_CACHE_TTL if ttl is None else ttl
+    )
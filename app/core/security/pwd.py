@@ -1,12 +1,96 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
 from passlib.context import CryptContext
 
+from app.config import settings
+
 # Handles the passwords
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+
+class HashingExecutor:
+    """Runs the bcrypt calls, which take hundreds of milliseconds of CPU,
+    on at most "max_workers" threads so they do not block the event loop.
+    Calls beyond that wait in the queue of the executor; its depth and the
+    time spent waiting are counted to size the pool.
+    """
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="bcrypt"
+        )
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.max_queued = 0
+        self.wait_seconds = 0.0
+
+    def _call(self, job: dict, fn: Callable, *args: Any) -> Any:
+        with self._lock:
+            if job["state"] == "queued":
+                self.queued -= 1
+                self.wait_seconds += time.monotonic() - job["submitted"]
+            job["state"] = "started"
+            self.running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        "Run fn(*args) on the pool and wait for its result."
+        job = {"state": "queued", "submitted": time.monotonic()}
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                self._call,
+                job,
+                fn,
+                *args
+            )
+        finally:
+            # A caller cancelled while the job is queued (e.g. the client
+            # disconnected) drops the job before it starts
+            with self._lock:
+                if job["state"] == "queued":
+                    self.queued -= 1
+                    job["state"] = "dropped"
+
+    def stats(self) -> dict:
+        "Counters of the pool, with the mean wait in the queue."
+        return {
+            "max_workers": self.max_workers,
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "max_queued": self.max_queued,
+            "mean_wait_seconds":
+                self.wait_seconds / self.completed if self.completed else None
+        }
+
+
+hashing_executor = HashingExecutor(settings.PASSWORD_HASH_WORKERS)
+
+
 # Functions to encrypt passwords and to verify passwords
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password, hashed_password):
+    return await hashing_executor.run(
+        pwd_context.verify,
+        plain_password,
+        hashed_password
+    )
 
 
-def password_hash(password):
-    return pwd_context.hash(password)
\ No newline at end of file
+async def password_hash(password):
+    return await hashing_executor.run(pwd_context.hash, password)
@@ -0,0 +1,70 @@
+import asyncio
+import hashlib
+import time
+
+from app.config import settings
+from app.models.user import User
+
+# Versions of the access tokens of each user, for the "stateless" auth
+# mode. The version of a user is a digest of their username, password hash
+# and role, so it changes whenever one of them does: tokens issued before
+# the change no longer match and are rejected. Deleted users have no
+# version.
+
+
+def token_version(user: dict) -> str:
+    "Version of the tokens of a user with the current claims and password."
+    raw = f'{user["username"]}:{user["password"]}:{user["role"]}'.encode()
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+class TokenVersions:
+    """In-memory map user id -> token version. It is read from the
+    database at startup and kept up to date by the user writes of this
+    process, one entry at a time (:meth:'TokenVersions.set',
+    :meth:'TokenVersions.discard'). It is read again "refresh" seconds
+    after the last read, to pick up the writes of other processes, or
+    on the next lookup after :meth:'TokenVersions.invalidate'. Every
+    other lookup is served from memory.
+    """
+    def __init__(self, refresh: float) -> None:
+        self.refresh = refresh
+        self._versions: dict[int, str] = {}
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or \
+            time.monotonic() - self._loaded_at >= self.refresh
+
+    async def load(self) -> None:
+        "Read the version of every user with a single query."
+        users = await User.all().values("id", "username", "password", "role")
+        self._versions = {user["id"]: token_version(user) for user in users}
+        self._loaded_at = time.monotonic()
+
+    async def get(self, user_id: int) -> str | None:
+        "Current token version of a user, 'None' when the user does not exist."
+        if self.is_stale():
+            async with self._lock:
+                if self.is_stale():
+                    await self.load()
+        return self._versions.get(user_id)
+
+    def set(self, user: dict) -> None:
+        "Store the version of a user created or updated by this process."
+        self._versions[user["id"]] = token_version(user)
+
+    def discard(self, user_id: int) -> None:
+        "Forget a user deleted by this process."
+        self._versions.pop(user_id, None)
+
+    def invalidate(self) -> None:
+        """Read the versions again on the next lookup, after a write that
+        does not say which users it changed (e.g. the users deleted in
+        cascade with their department).
+        """
+        self._loaded_at = None
+
+
+token_versions = TokenVersions(settings.TOKEN_VERSIONS_REFRESH)
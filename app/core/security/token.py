@@ -1,12 +1,20 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from app.config import settings
+from app.core.cache import TTLCache
+from app.core.security.revocation import token_version
 
 # Defines the authentication schema
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login/")
 
+# Claims of the access tokens already verified, by digest of the token.
+# Each entry expires with its token.
+decoded_tokens = TTLCache("token", settings.TOKEN_CACHE_SIZE, ttl=0)
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     if expires_delta:
@@ -19,4 +27,55 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
         settings.SECRET_KEY,
         settings.ALGORITHM)
     return encoded_jwt
-    
\ No newline at end of file
+
+
+def user_claims(user: dict) -> dict:
+    """Claims of the access token of a user. In "stateless" auth mode the
+    token also carries the user id, role and token version, so requests
+    are authorized without reading the user.
+    """
+    claims = {"sub": user["username"]}
+    if settings.AUTH_MODE == "stateless":
+        claims.update({
+            "uid": user["id"],
+            "role": user["role"],
+            "ver": token_version(user)
+        })
+    return claims
+
+
+def create_refresh_token(user: dict, session: dict) -> str:
+    """Refresh token of a session, see
+    :meth:'CRUDRefreshToken.create_session'. It can only be exchanged at
+    /api/login/refresh, never used as an access token.
+    """
+    return jwt.encode(
+        {
+            "sub": user["username"],
+            "typ": "refresh",
+            "fam": session["family"],
+            "jti": session["jti"],
+            "exp": session["expires_at"]
+        },
+        settings.SECRET_KEY,
+        settings.ALGORITHM
+    )
+
+
+def decode_access_token(token: str) -> dict:
+    """Verify the signature and expiration of a token and return its
+    claims. Tokens already verified are served from "decoded_tokens"
+    until they expire, without verifying them again.
+    Raises 'JWTError' when the token is not valid.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = decoded_tokens.get(key)
+    if payload is None:
+        payload = jwt.decode(
+            token,
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM]
+            )
+        if "exp" in payload:
+            decoded_tokens.set(key, payload, ttl=payload["exp"] - time.time())
+    return dict(payload)
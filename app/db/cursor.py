@@ -0,0 +1,45 @@
+from typing import Any, AsyncIterator
+
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.queryset import ValuesQuery
+
+# Number of rows fetched from the server on each round trip of a cursor
+CURSOR_PREFETCH = 500
+
+
+async def iterate_values(
+    query: ValuesQuery,
+    prefetch: int = CURSOR_PREFETCH
+    ) -> AsyncIterator[dict]:
+    """
+    Iterate over the rows of a ".values()" query using a PostgreSQL
+    server-side cursor, so only "prefetch" rows are held in memory at a
+    time. The cursor runs on its own pooled connection inside a read
+    transaction that is closed when the iteration finishes.
+    """
+    async for row in iterate_rows(
+        query.model._meta.db,
+        query.sql(),
+        prefetch=prefetch
+    ):
+        yield row
+
+
+async def iterate_rows(
+    db: BaseDBAsyncClient,
+    sql: str,
+    values: list[Any] | None = None,
+    prefetch: int = CURSOR_PREFETCH
+    ) -> AsyncIterator[dict]:
+    """
+    Same as "iterate_values" for a raw SQL query with "values" as its
+    parameters ($1, $2...).
+    """
+    async with db.acquire_connection() as connection:
+        async with connection.transaction():
+            async for record in connection.cursor(
+                sql,
+                *(values or []),
+                prefetch=prefetch
+            ):
+                yield dict(record)
@@ -17,6 +17,7 @@ TORTOISE_ORM = {
                 "app.models.project",
                 "app.models.user",
                 "app.models.project_collaborator",
+                "app.models.refresh_token",
                 "aerich.models"
                 ],
             "default_connection": "default",
@@ -37,7 +38,8 @@ def init_db(app: FastAPI) -> None:
             "app.models.job",
             "app.models.project",
             "app.models.user",
-            "app.models.project_collaborator"
+            "app.models.project_collaborator",
+            "app.models.refresh_token"
             ]},
         generate_schemas=True,
         add_exception_handlers=True,
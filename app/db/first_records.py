@@ -21,7 +21,7 @@ async def first_records():
     print("asd")
     await department.save()
 
-    info_user["password"] = password_hash(info_user["password"])
+    info_user["password"] = await password_hash(info_user["password"])
     user = User(**info_user)
     await user.save()
 
@@ -0,0 +1,119 @@
+from typing import Any, Type
+
+from tortoise.models import Model
+
+# Helpers to build the PostgreSQL statements that Tortoise-ORM does not
+# expose, e.g. multi-row INSERT ... RETURNING. Values are always sent as
+# query parameters ($1, $2...), never formatted into the SQL.
+
+
+def quote(name: str) -> str:
+    "Quote a table or column name."
+    return '"' + name.replace('"', '""') + '"'
+
+
+async def insert_returning(
+    model: Type[Model],
+    instances: list[Model],
+    batch_size: int
+    ) -> list[dict]:
+    """
+    Insert the (not yet saved) instances with multi-row INSERT statements
+    of at most "batch_size" rows each.
+    :return: The inserted rows, in the same order as "instances".
+    """
+    meta = model._meta
+    fields = [
+        field for field in meta.fields_db_projection
+        if not meta.fields_map[field].generated
+    ]
+    columns = ", ".join(quote(meta.fields_db_projection[f]) for f in fields)
+    inserted = []
+    for offset in range(0, len(instances), batch_size):
+        batch = instances[offset:offset + batch_size]
+        rows, values = [], []
+        for instance in batch:
+            placeholders = []
+            for field in fields:
+                values.append(
+                    meta.fields_map[field].to_db_value(
+                        getattr(instance, field),
+                        instance
+                    )
+                )
+                placeholders.append(f"${len(values)}")
+            rows.append(f"({', '.join(placeholders)})")
+        inserted += await meta.db.execute_query_dict(
+            f"INSERT INTO {quote(meta.db_table)} ({columns}) "
+            f"VALUES {', '.join(rows)} RETURNING *",
+            values
+        )
+    return inserted
+
+
+def where_equal(
+    model: Type[Model],
+    field: str,
+    value: Any,
+    values: list
+    ) -> str:
+    """
+    Build the condition "field = value" and add "value" to the query
+    parameters. A list of values is matched with "field = ANY(values)".
+    """
+    meta = model._meta
+    column = quote(meta.fields_db_projection[field])
+    if isinstance(value, (list, tuple, set)):
+        values.append(list(value))
+        return f"{column} = ANY(${len(values)})"
+    values.append(meta.fields_map[field].to_db_value(value, model))
+    return f"{column} = ${len(values)}"
+
+
+async def update_returning(
+    model: Type[Model],
+    data_update: dict,
+    field: str,
+    value: Any
+    ) -> list[dict]:
+    """
+    Update the rows whose "field" is equal to "value", or is in "value"
+    when it is a list, with a single UPDATE statement.
+    :return: The updated rows.
+    """
+    meta = model._meta
+    assignments, values = [], []
+    for key, new_value in data_update.items():
+        values.append(meta.fields_map[key].to_db_value(new_value, model))
+        column = meta.fields_db_projection[key]
+        assignments.append(f"{quote(column)} = ${len(values)}")
+    where = where_equal(model, field, value, values)
+    return await meta.db.execute_query_dict(
+        f"UPDATE {quote(meta.db_table)} SET {', '.join(assignments)} "
+        f"WHERE {where} RETURNING *",
+        values
+    )
+
+
+async def delete_returning(
+    model: Type[Model],
+    field: str,
+    value: Any,
+    limit: int | None = None
+    ) -> list[dict]:
+    """
+    Delete the rows whose "field" is equal to "value", or is in "value"
+    when it is a list, with a single DELETE statement. With "limit", at
+    most that many rows are deleted.
+    :return: The deleted rows.
+    """
+    meta = model._meta
+    table, pk = quote(meta.db_table), quote(meta.db_pk_column)
+    values = []
+    where = where_equal(model, field, value, values)
+    if limit is not None:
+        where = f"{pk} IN (SELECT {pk} FROM {table} WHERE {where} LIMIT {int(limit)})"
+    return await meta.db.execute_query_dict(
+        f"DELETE FROM {table} WHERE {where} RETURNING *",
+        values
+    )
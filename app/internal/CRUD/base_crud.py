@@ -1,53 +1,246 @@
+from collections import defaultdict
 from typing import Any, Generic, TypeVar, Optional
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from tortoise.expressions import Q
+from tortoise.transactions import in_transaction
 
+from app.core.cache import TTLCache
+from app.db.sql import insert_returning, update_returning, delete_returning
 from app.models.base_class import Base
+from app.internal.CRUD.query_params import (
+    InvalidQueryParam,
+    encode_cursor,
+    decode_cursor
+)
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# Rows sent on each multi-row INSERT of a bulk create
+BULK_BATCH_SIZE = 500
+
+
+class ConflictError(Exception):
+    """Raised when a write would conflict with existing records. The
+    conflicting records are kept in "conflicts".
+    """
+    def __init__(self, message: str, conflicts: list[dict]):
+        super().__init__(message)
+        self.conflicts = conflicts
+
+
+class MissingReference(ConflictError):
+    pass
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
-    def __init__(self, model: ModelType):
+    def __init__(
+        self,
+        model: ModelType,
+        *,
+        cache: TTLCache | None = None,
+        cascade: tuple["CRUDBase", ...] = (),
+        sortable: tuple[str, ...] = ("id",),
+        public_fields: tuple[str, ...] | None = None
+    ):
         """CRUD object with default methods to Create, Read, Update,
         Delete (CRUD).
         **Parameters**
         * `model`: A Tortoise ORM model class
-        * `schema`: A Pydantic model (schema) class
+        * `cache`: Optional cache of :meth:'CRUDBase.get_by_field'. It is
+        cleared on every write made through this object
+        * `cascade`: CRUD objects whose records are deleted in cascade
+        with the records of this one, so their caches are cleared too
+        * `sortable`: Columns :meth:'CRUDBase.get_all' can sort by. Their
+        values are sent back in the cursors, so only short columns that
+        the routes return belong here
+        * `public_fields`: Columns the routes return, the only ones a
+        sparse fieldset can select. Every column when 'None'
         """
         self.model = model
+        self.cache = cache
+        self.cascade = cascade
+        self.sortable = sortable
+        self.public_fields = public_fields or tuple(model._meta.db_fields)
 
-    async def get_all(self) -> list[ModelType]:
-        db_objs = await self.model.all().values()
+    def invalidate_cache(self) -> None:
+        "Clear the cache of this object and of the objects in cascade."
+        if self.cache is not None:
+            self.cache.clear()
+        for crud in self.cascade:
+            crud.invalidate_cache()
+
+    def projection(self, fields: list[str] | None, *required: str) -> list[str]:
+        """
+        Columns to select for a sparse fieldset: "fields" plus the
+        "required" ones. An empty list (select every column) when "fields"
+        is 'None'.
+        Raises 'InvalidQueryParam' when a field is not one of
+        :attr:'CRUDBase.public_fields'.
+        """
+        if fields is None:
+            return []
+        for field in fields:
+            if field not in self.public_fields:
+                raise InvalidQueryParam(f"Unknown field '{field}'")
+        return list(dict.fromkeys([*fields, *required]))
+
+    async def get_all(
+        self,
+        *,
+        limit: int | None = None,
+        cursor: str | None = None,
+        order_by: str = "id",
+        fields: list[str] | None = None
+        ) -> list[ModelType]:
+        """
+        Get the records sorted by "order_by" and then by id. With "limit"
+        only that many records are returned, and "cursor" (see
+        :meth:'CRUDBase.next_cursor') continues after the last record of
+        the previous page. Keyset pagination: every page costs the same
+        no matter how deep it is.
+        With "fields" only those columns (plus id and "order_by") are
+        selected.
+        Raises 'InvalidQueryParam' when "order_by" is not one of
+        :attr:'CRUDBase.sortable', one of "fields" is not one of
+        :attr:'CRUDBase.public_fields' or the cursor is not valid.
+        """
+        if order_by not in self.sortable:
+            raise InvalidQueryParam(f"Unknown field '{order_by}' to sort by")
+        # The sort column and id are always selected to build the cursor
+        projection = self.projection(fields, order_by, "id")
+
+        query = self.model.all()
+        if cursor is not None:
+            last_value, last_id = decode_cursor(cursor)
+            if order_by == "id":
+                query = query.filter(id__gt=last_id)
+            else:
+                query = query.filter(
+                    Q(**{f"{order_by}__gt": last_value})
+                    | Q(**{order_by: last_value, "id__gt": last_id})
+                )
+        query = query.order_by(*dict.fromkeys([order_by, "id"]))
+        if limit is not None:
+            query = query.limit(limit)
+
+        try:
+            db_objs = await query.values(*projection)
+        except (ValueError, TypeError):
+            raise InvalidQueryParam("Invalid cursor")
         return db_objs
+
+    def next_cursor(
+        self,
+        db_objs: list[dict],
+        limit: int | None,
+        order_by: str = "id"
+        ) -> str | None:
+        """
+        Cursor of the page that follows "db_objs", or 'None' when it was
+        the last page.
+        """
+        if limit is None or len(db_objs) < limit:
+            return None
+        return encode_cursor([db_objs[-1][order_by], db_objs[-1]["id"]])
     
     async def get_by_field(
         self,
         field: str, 
-        value: Any
+        value: Any,
+        fields: list[str] | None = None,
+        use_cache: bool = True
         ) -> Optional[ModelType]:
         """
         Get by any field in the database, such as "name", "username",
-        "email" etc.
+        "email" etc. With "fields" only those columns are selected.
         Returns 'None' when :attr:'CRUDBase.model' does not have attribute
         'field'.
+        Raises 'InvalidQueryParam' when one of "fields" is not one of
+        :attr:'CRUDBase.public_fields'.
+        Read through :attr:'CRUDBase.cache' when there is one, unless
+        "use_cache" is False.
         """
+        projection = self.projection(fields)
+        key = (field, value, tuple(projection))
+        if self.cache is not None and use_cache:
+            db_obj = self.cache.get(key)
+            if db_obj is not None:
+                return dict(db_obj)
         try:
-            db_obj = await self.model.filter(**{field:value}).first().values()
+            db_obj = await self.model.filter(**{field:value}).first()\
+            .values(*projection)
         except Exception:
             return None
-        
+
+        if self.cache is not None and db_obj is not None:
+            self.cache.set(key, dict(db_obj))
         return db_obj
 
     async def create(self, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)
         await db_obj.save()
+        self.invalidate_cache()
         return db_obj
 
+    async def create_bulk(
+        self,
+        objs_in: list[CreateSchemaType],
+        batch_size: int = BULK_BATCH_SIZE
+        ) -> list[dict]:
+        """
+        Create many records in one transaction, using multi-row INSERT
+        statements of "batch_size" rows. If one record fails, none is
+        created. Fields sent as None take the default of the model.
+        When some records point to rows that do not exist, the exception
+        will be raise: MissingReference, with one entry per record.
+        :return: The created records, in the same order as "objs_in".
+        """
+        rows = [jsonable_encoder(obj_in, exclude_none=True) for obj_in in objs_in]
+        errors = await self.missing_references(rows)
+        if errors:
+            raise MissingReference(
+                f"Some {self.model.__name__.lower()} entries point to"
+                " records that do not exist",
+                errors
+            )
+        db_objs = [self.model(**row) for row in rows]
+        async with in_transaction():
+            created = await insert_returning(self.model, db_objs, batch_size)
+        self.invalidate_cache()
+        return created
+
+    async def missing_references(self, rows: list[dict]) -> list[dict]:
+        """
+        Check the foreign keys of a batch of rows at once, with one query
+        per referenced table.
+        :return: One entry per row that points to a record that does not
+        exist, with its "index" in the batch and the "detail".
+        """
+        details = defaultdict(list)
+        for fk_name in sorted(self.model._meta.fk_fields):
+            fk_field = self.model._meta.fields_map[fk_name]
+            column = fk_field.source_field
+            referenced = {row.get(column) for row in rows} - {None}
+            if not referenced:
+                continue
+            existing = set(
+                await fk_field.related_model.filter(id__in=referenced)
+                    .values_list("id", flat=True)
+            )
+            missing = referenced - existing
+            for index, row in enumerate(rows):
+                if row.get(column) in missing:
+                    details[index].append(f"{column} {row[column]} does not exist")
+        return [
+            {"index": index, "detail": ". ".join(details[index]), "conflicts": []}
+            for index in sorted(details)
+        ]
+
     async def update_by_field(
         self,
         field: str,
@@ -56,41 +249,84 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         ) -> dict:
         """
         Update by any field in the database, such as "name", "username",
-        "email" etc.
+        "email" etc. The update and the read of the updated record are a
+        single UPDATE ... RETURNING statement.
         Returns 'None' when :attr:'CRUDBase.model' does not have attribute
         'field'.
+        :return: The whole updated record.
         """
-        data_update = jsonable_encoder(obj_in, exclude_unset=True)      
+        data_update = jsonable_encoder(obj_in, exclude_unset=True)
         try:
-            db_obj_update = await self.model.filter(**{field:value})\
-            .update(**data_update)   
+            if not data_update:
+                db_obj_update = await self.model.filter(**{field:value})\
+                .limit(1).values()
+            else:
+                db_obj_update = await update_returning(
+                    self.model,
+                    data_update,
+                    field,
+                    value
+                )
         except Exception:
             return None
+        finally:
+            self.invalidate_cache()
 
         """Raise Exception when the "value" of field does not exist in the 
         database"""
         if not db_obj_update:
             raise Exception("The value of field doesn't exist in the database")
         else:
-            return data_update
+            return db_obj_update[0]
 
     async def remove_by_field(
         self,
         field: str,
         value: Any
-        ) -> ModelType:
+        ) -> dict:
         """
         Delete by any field in the database, such as "name", "username",
-        "email" etc.
+        "email" etc. Only the first matching record is deleted, with a
+        single DELETE ... RETURNING statement.
         Returns 'None' when :attr:'CRUDBase.model' does not have attribute
-        'field'.
+        'field', or when no record matches.
+        :return: The deleted record.
         """
         try:
-            obj = await self.model.filter(**{field:value}).first()
-        except Exception:
+            deleted = await delete_returning(self.model, field, value, limit=1)
+        except KeyError:
             return None
-        await obj.delete()
-        return obj
+        self.invalidate_cache()
+        return deleted[0] if deleted else None
+
+    async def update_bulk(
+        self,
+        ids: list[int],
+        obj_in: UpdateSchemaType | dict
+        ) -> list[dict]:
+        """
+        Update every record whose id is in "ids" with the same values, in
+        a single UPDATE statement.
+        :return: The updated records. Ids that do not exist in the
+        database are left out.
+        """
+        data_update = jsonable_encoder(obj_in, exclude_unset=True)
+        if not data_update:
+            return []
+        updated = await update_returning(self.model, data_update, "id", ids)
+        self.invalidate_cache()
+        return updated
+
+    async def remove_bulk(self, ids: list[int]) -> list[dict]:
+        """
+        Delete every record whose id is in "ids", in a single DELETE
+        statement.
+        :return: The deleted records. Ids that do not exist in the
+        database are left out.
+        """
+        deleted = await delete_returning(self.model, "id", ids)
+        self.invalidate_cache()
+        return deleted
 
     async def count_records(self) -> int:
         "Returns the total number of records in a database table."
@@ -0,0 +1,108 @@
+import base64
+import binascii
+import json
+from typing import Any
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+
+# Largest page that can be requested from a list route
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidQueryParam(ValueError):
+    """Raised when a list or detail query receives a parameter that does
+    not match the model, e.g. an unknown sort column or a bad cursor.
+    """
+    pass
+
+
+def encode_cursor(values: list[Any]) -> str:
+    "Build the opaque cursor that points right after a row."
+    raw = json.dumps(jsonable_encoder(values)).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    "Get back the values stored in a cursor built by encode_cursor."
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError):
+        raise InvalidQueryParam("Invalid cursor")
+    if not isinstance(values, list) or len(values) != 2:
+        raise InvalidQueryParam("Invalid cursor")
+    return values
+
+
+class Page:
+    """Keyset pagination of a list: at most "limit" rows sorted by
+    "order_by" (then by id), starting after the row pointed by "cursor".
+    A "limit" of None returns every row.
+    """
+    def __init__(
+        self,
+        limit: int | None = None,
+        cursor: str | None = None,
+        order_by: str = "id"
+    ) -> None:
+        self.limit = limit
+        self.cursor = cursor
+        self.order_by = order_by
+
+
+def page_params(
+    limit: int | None = Query(
+        None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Maximum number of entries to return"
+    ),
+    cursor: str | None = Query(
+        None,
+        description="Value of the X-Next-Cursor header of the previous page"
+    ),
+    order_by: str = Query(
+        "id",
+        description="Field used to sort the entries"
+    )
+) -> Page:
+    "Dependency that reads the pagination query parameters of a list route."
+    return Page(limit=limit, cursor=cursor, order_by=order_by)
+
+
+def fields_params(
+    fields: str | None = Query(
+        None,
+        description="Comma separated fields to return, e.g. 'id,name'"
+    )
+) -> list[str] | None:
+    "Dependency that reads the sparse fieldset of a list or detail route."
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+
+def ids_params(
+    ids: list[int] = Query(
+        ...,
+        min_items=1,
+        max_items=MAX_PAGE_SIZE,
+        description="Ids of the entries, e.g. '?ids=1&ids=2'"
+    )
+) -> list[int]:
+    "Dependency that reads the ids of a batch route."
+    return list(dict.fromkeys(ids))
+
+
+def timezone_params(
+    tz: str = Query(
+        "UTC",
+        description="IANA time zone of the dates, e.g. 'America/Bogota'"
+    )
+) -> ZoneInfo:
+    "Dependency that reads the time zone used to interpret the dates."
+    try:
+        return ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(400, detail=f"Unknown time zone '{tz}'")
@@ -1,9 +1,11 @@
 from typing import Any
 
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 
-from app.internal.CRUD.base_crud import CRUDBase
+from app.internal.CRUD.base_crud import CRUDBase, ConflictError
+from app.internal.CRUD.query_params import Page, InvalidQueryParam
 from app.models.base_class import Base
 
 
@@ -20,10 +22,38 @@ class WebCRUDWrapper:
         self.enty_name: str = enty_name.lower()
         self.enty_name_plural = self.enty_name + 's'
 
-    async def get_all_entries(self) -> list[Base]:
-        'Get all db entries of entity'
-        all_enties = await self.crud.get_all()
+    async def get_all_entries(
+        self,
+        page: Page | None = None,
+        response: Response | None = None,
+        fields: list[str] | None = None
+    ) -> list[Base]:
+        """Get all db entries of entity, or one page of them. When there
+        are more entries, the cursor of the next page is sent in the
+        "X-Next-Cursor" header of "response". "fields" limits the
+        columns read from the database.
+        """
+        page = page or Page()
+        try:
+            all_enties = await self.crud.get_all(
+                limit=page.limit,
+                cursor=page.cursor,
+                order_by=page.order_by,
+                fields=fields
+            )
+        except InvalidQueryParam as e:
+            raise HTTPException(400, detail=str(e))
+
         if len(all_enties) != 0:
+            next_cursor = self.crud.next_cursor(
+                all_enties,
+                page.limit,
+                page.order_by
+            )
+            if response is not None and next_cursor is not None:
+                response.headers["X-Next-Cursor"] = next_cursor
+            return all_enties
+        elif page.cursor is not None:
             return all_enties
         else:
             raise HTTPException(
@@ -34,9 +64,17 @@ class WebCRUDWrapper:
     async def get_enty_by_field(
         self, 
         field: str, 
-        value_in: Any
+        value_in: Any,
+        fields: list[str] | None = None
         ) -> Base:
-        enty_by_name = await self.crud.get_by_field(field, value_in)
+        try:
+            enty_by_name = await self.crud.get_by_field(
+                field,
+                value_in,
+                fields=fields
+            )
+        except InvalidQueryParam as e:
+            raise HTTPException(400, detail=str(e))
 
         if not enty_by_name:
             raise HTTPException(
@@ -69,6 +107,40 @@ class WebCRUDWrapper:
         
         return created_enty
 
+    async def post_bulk(
+        self,
+        *,
+        enties_info: list[BaseModel]
+    ) -> list[dict]:
+        """Create all the entries of the batch or none of them. When some
+        entries conflict with the database or point to records that do not
+        exist, HTTP 409 is returned with one entry per rejected item in
+        "conflicts".
+        """
+        if not enties_info:
+            raise HTTPException(
+                400,
+                detail=f'No {self.enty_name_plural} to create'
+            )
+        try:
+            created_enties = await self.crud.create_bulk(enties_info)
+        except ConflictError as e:
+            raise HTTPException(
+                409,
+                detail={
+                    "message": str(e),
+                    "conflicts": jsonable_encoder(e.conflicts)
+                }
+            )
+        except Exception:
+            raise HTTPException(
+                500,
+                detail=f'Error while creating {self.enty_name_plural} in'
+                    ' database. None of them was created'
+            )
+
+        return created_enties
+
     async def update_enty_by_field(
         self,
         *,
@@ -82,6 +154,14 @@ class WebCRUDWrapper:
                 value=value_in,
                 obj_in=enty_new_info
             )
+        except ConflictError as e:
+            raise HTTPException(
+                409,
+                detail={
+                    "message": str(e),
+                    "conflicts": jsonable_encoder(e.conflicts)
+                }
+            )
         except Exception:
             raise HTTPException(
                 500,
@@ -97,6 +177,64 @@ class WebCRUDWrapper:
 
         return updated_enty
 
+    async def update_bulk(
+        self,
+        *,
+        ids: list[int],
+        enty_new_info: BaseModel
+    ) -> list[dict]:
+        """Update all the entries in "ids" with the same values. Ids that
+        do not exist are left out of the response.
+        """
+        try:
+            updated_enties = await self.crud.update_bulk(ids, enty_new_info)
+        except ConflictError as e:
+            raise HTTPException(
+                409,
+                detail={
+                    "message": str(e),
+                    "conflicts": jsonable_encoder(e.conflicts)
+                }
+            )
+        except Exception:
+            raise HTTPException(
+                500,
+                f'Error while updating {self.enty_name_plural} in database'
+            )
+
+        if not updated_enties:
+            raise HTTPException(
+                400,
+                f'No {self.enty_name_plural} were updated'
+            )
+
+        return updated_enties
+
+    async def delete_bulk(
+        self,
+        *,
+        ids: list[int]
+    ) -> list[dict]:
+        """Delete all the entries in "ids". Ids that do not exist are left
+        out of the response.
+        """
+        try:
+            deleted_enties = await self.crud.remove_bulk(ids)
+        except Exception:
+            raise HTTPException(
+                500,
+                f'Error while deleting {self.enty_name_plural} from database.'
+                f' Probably other entries still depend on them'
+            )
+
+        if not deleted_enties:
+            raise HTTPException(
+                400,
+                f'No {self.enty_name_plural} were deleted'
+            )
+
+        return deleted_enties
+
     async def delete_enty_by_field(
         self,
         *,
@@ -1,10 +1,18 @@
 from .CRUD.web_crud import WebCRUDWrapper
+from .CRUD.query_params import (
+    Page,
+    page_params,
+    fields_params,
+    ids_params,
+    timezone_params
+)
 from .deparment_crud import deparment
 from  .user_crud import user
 from .job_crud import job
 from .collaborator_crud import collaborator
 from .project_crud import project
 from .assignment_crud import assignment
-from .assignment_crud import CollaboratorNotInProject
+from .assignment_crud import CollaboratorNotInProject, AssignmentOverlap
 from .project_collaborator import project_collaborator_obj
-from .announcement_crud import announcement
\ No newline at end of file
+from .announcement_crud import announcement
+from .refresh_token_crud import refresh_token, InvalidRefreshToken
\ No newline at end of file
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+
+from app.config import settings
+from app.internal.announcement_crud import CRUDAnnouncement, announcement
+
+logger = logging.getLogger("announcement_archiver")
+
+
+class AnnouncementArchiver:
+    """Moves the announcements older than the retention window of "crud"
+    to its archive every "interval" seconds, "batch_size" announcements
+    per statement. Several processes can run it at the same time, each
+    batch skips the rows another one is moving.
+    """
+    def __init__(
+        self,
+        crud: CRUDAnnouncement,
+        *,
+        interval: float,
+        batch_size: int
+    ) -> None:
+        self.crud = crud
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stopping: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def archive(self) -> int:
+        "Move the announcements out of the hot window now."
+        before = self.crud.hot_window_start()
+        if before is None:
+            return 0
+        return await self.crud.archive_announcements(before, self.batch_size)
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                moved = await self.archive()
+                if moved:
+                    logger.info(f"Archived {moved} announcements")
+            except Exception:
+                logger.exception("Could not archive the announcements")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        "Start the archiving task in the running event loop."
+        if self.running or self.crud.hot_window_start() is None:
+            return
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        "Stop the archiving task once its current run ends."
+        if not self.running:
+            return
+        task, self._task = self._task, None
+        self._stopping.set()
+        await task
+
+
+announcement_archiver = AnnouncementArchiver(
+    announcement,
+    interval=settings.ANNOUNCEMENT_ARCHIVE_INTERVAL,
+    batch_size=settings.ANNOUNCEMENT_ARCHIVE_BATCH_SIZE
+)
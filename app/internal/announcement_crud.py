@@ -1,40 +1,277 @@
 import datetime
+import heapq
+from zoneinfo import ZoneInfo
 
+from tortoise.expressions import Q
 from tortoise.models import Model
 from fastapi.encoders import jsonable_encoder
 
-from app.models.announcement import Announcement
+from app.config import settings
+from app.core.broadcast import Broadcaster
+from app.db.sql import insert_returning
+from app.internal.CRUD.query_params import (
+    InvalidQueryParam,
+    encode_cursor,
+    decode_cursor
+)
+from app.models.announcement import Announcement, AnnouncementArchive
 from app.schemas import AnnouncementCreate
 
+UTC = ZoneInfo("UTC")
+
+# Moves up to $2 announcements older than $1 to the archive in a single
+# short transaction. Rows locked by a concurrent run are skipped, and rows
+# already archived are only removed.
+ARCHIVE_QUERY = """
+WITH moved AS (
+    DELETE FROM announcement
+    WHERE id IN (
+        SELECT id FROM announcement
+        WHERE date < $1
+        ORDER BY date, id
+        LIMIT $2
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, name, description, date, user_id
+)
+INSERT INTO announcement_archive (id, name, description, date, user_id)
+SELECT id, name, description, date, user_id FROM moved
+ON CONFLICT (id) DO NOTHING
+RETURNING id
+"""
+
 
 class CRUDAnnouncement():
-    def __init__(self, model: Model):
+    def __init__(
+        self,
+        model: Model,
+        broadcaster: Broadcaster,
+        *,
+        archive_model: Model | None = None,
+        retention: datetime.timedelta | None = None
+    ):
         """Object in charge of creating new announcements, get the
         announcements of the current day, and filter announcements by
         dates.
         **Parameters**
         * `model`: A Tortoise ORM model class
+        * `broadcaster`: Where the new announcements are published
+        * `archive_model`: Model of the announcements moved out of "model"
+        once they are older than "retention"
         """
         self.model = model
+        self.broadcaster = broadcaster
+        self.archive_model = archive_model
+        self.retention = retention
     
     async def create_announcement(self, obj_in: AnnouncementCreate):
         announcement_data = jsonable_encoder(obj_in)
         announcement_obj = self.model(**announcement_data)
         await announcement_obj.save()
+        self.broadcaster.publish({
+            field: getattr(announcement_obj, field)
+            for field in self.model._meta.db_fields
+        })
         return announcement_obj
 
-    async def today_announcement(self):
-        today = datetime.datetime.now()
-        return await self.model.filter(
-            date__year=today.year,
-            date__month=today.month,
-            date__day=today.day
-            ).all()
+    async def create_announcements(
+        self,
+        objs_in: list[AnnouncementCreate | dict],
+        batch_size: int = 500
+        ) -> list[dict]:
+        """
+        Create many announcements with multi-row INSERT statements of
+        "batch_size" rows.
+        :return: The created announcements, in the same order.
+        """
+        announcement_objs = [
+            self.model(**jsonable_encoder(obj_in)) for obj_in in objs_in
+        ]
+        created = await insert_returning(self.model, announcement_objs, batch_size)
+        for announcement_data in created:
+            self.broadcaster.publish(announcement_data)
+        return created
+
+    async def announcements_after(
+        self,
+        last_id: int,
+        limit: int
+        ) -> list[dict]:
+        "Get up to 'limit' announcements created after the id 'last_id'."
+        return await self.model.filter(id__gt=last_id)\
+            .order_by("id").limit(limit).values()
+
+    @staticmethod
+    def day_range(
+        start_date: datetime.date,
+        final_date: datetime.date,
+        tz: ZoneInfo = UTC
+        ) -> tuple[datetime.datetime, datetime.datetime]:
+        """
+        Half-open range of instants [start, end) covering the days from
+        "start_date" to "final_date" in the time zone "tz".
+        """
+        start = datetime.datetime.combine(start_date, datetime.time(), tz)
+        end = datetime.datetime.combine(
+            final_date + datetime.timedelta(days=1),
+            datetime.time(),
+            tz
+        )
+        return start, end
+
+    def hot_window_start(self) -> datetime.datetime | None:
+        """
+        Announcements older than this instant may be in the archive,
+        'None' when announcements are never archived.
+        """
+        if self.archive_model is None or not self.retention:
+            return None
+        return datetime.datetime.now(UTC) - self.retention
+
+    async def archive_announcements(
+        self,
+        before: datetime.datetime,
+        batch_size: int
+        ) -> int:
+        """
+        Move the announcements created before "before" to the archive,
+        "batch_size" announcements per statement so no lock is held for
+        long.
+        :return: The number of announcements moved.
+        """
+        db = self.model._meta.db
+        moved = 0
+        while True:
+            rows = await db.execute_query_dict(
+                ARCHIVE_QUERY,
+                [before, batch_size]
+            )
+            moved += len(rows)
+            if len(rows) < batch_size:
+                return moved
+
+    @staticmethod
+    async def range_values(
+        model: Model,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        limit: int | None,
+        after: tuple[datetime.datetime, int] | None
+        ) -> list[dict]:
+        "Rows of 'model' with 'start' <= date < 'end' after the key 'after'."
+        query = model.filter(date__gte=start, date__lt=end)
+        if after is not None:
+            last_date, last_id = after
+            query = query.filter(
+                Q(date__gt=last_date) | Q(date=last_date, id__gt=last_id)
+            )
+        query = query.order_by("date", "id")
+        if limit is not None:
+            query = query.limit(limit)
+        return await query.values()
+
+    async def announcements_in_range(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        *,
+        limit: int | None = None,
+        cursor: str | None = None
+        ) -> list[dict]:
+        """
+        Get the announcements with "start" <= date < "end" sorted by
+        (date, id), served by the (date, id) index. With "limit" only that
+        many announcements are returned, and "cursor" (see
+        :meth:'CRUDAnnouncement.next_cursor') continues after the last
+        announcement of the previous page.
+        When the range starts before the hot window, the archived
+        announcements are merged in.
+        Raises 'InvalidQueryParam' when the cursor is not valid.
+        """
+        after = None
+        if cursor is not None:
+            last_date, last_id = decode_cursor(cursor)
+            try:
+                after = (
+                    datetime.datetime.fromisoformat(last_date),
+                    int(last_id)
+                )
+            except (TypeError, ValueError):
+                raise InvalidQueryParam("Invalid cursor")
+        announcements = await self.range_values(
+            self.model, start, end, limit, after
+        )
+        hot_window_start = self.hot_window_start()
+        if hot_window_start is None or start >= hot_window_start:
+            return announcements
+        # Read after the hot table, so an announcement archived in between
+        # is found twice instead of missed
+        archived = await self.range_values(
+            self.archive_model, start, end, limit, after
+        )
+        merged = []
+        seen = set()
+        for announcement_data in heapq.merge(
+            announcements,
+            archived,
+            key=lambda a: (a["date"], a["id"])
+        ):
+            if announcement_data["id"] in seen:
+                continue
+            seen.add(announcement_data["id"])
+            merged.append(announcement_data)
+            if len(merged) == limit:
+                break
+        return merged
 
-    async def announcements_between_dates(self, start_date, final_date):
-        return await self.model.filter(
-            date__range=(start_date, final_date)
-            ).all()
+    @staticmethod
+    def next_cursor(announcements: list[dict], limit: int | None) -> str | None:
+        """
+        Cursor of the page that follows "announcements", 'None' when it
+        was the last page.
+        """
+        if limit is None or len(announcements) < limit:
+            return None
+        return encode_cursor([announcements[-1]["date"], announcements[-1]["id"]])
+
+    async def today_announcement(
+        self,
+        tz: ZoneInfo = UTC,
+        *,
+        limit: int | None = None,
+        cursor: str | None = None
+        ) -> list[dict]:
+        "Get the announcements of the current day in the time zone 'tz'."
+        today = datetime.datetime.now(tz).date()
+        return await self.announcements_in_range(
+            *self.day_range(today, today, tz),
+            limit=limit,
+            cursor=cursor
+        )
+
+    async def announcements_between_dates(
+        self,
+        start_date: datetime.date,
+        final_date: datetime.date,
+        tz: ZoneInfo = UTC,
+        *,
+        limit: int | None = None,
+        cursor: str | None = None
+        ) -> list[dict]:
+        """
+        Get the announcements from the start of "start_date" to the end
+        of "final_date" in the time zone "tz".
+        """
+        return await self.announcements_in_range(
+            *self.day_range(start_date, final_date, tz),
+            limit=limit,
+            cursor=cursor
+        )
 
 
-announcement = CRUDAnnouncement(Announcement)
\ No newline at end of file
+announcement = CRUDAnnouncement(
+    Announcement,
+    Broadcaster(settings.ANNOUNCEMENT_STREAM_QUEUE_SIZE),
+    archive_model=AnnouncementArchive,
+    retention=datetime.timedelta(days=settings.ANNOUNCEMENT_RETENTION_DAYS)
+)
\ No newline at end of file
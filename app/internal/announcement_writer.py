@@ -0,0 +1,263 @@
+import asyncio
+import logging
+
+from app.config import settings
+from app.internal.announcement_crud import CRUDAnnouncement, announcement
+from app.internal.handler_announcement import InfoCollaboratorAnnouncement
+
+logger = logging.getLogger("announcement_writer")
+
+# Names of the projects ($1) and collaborators ($2) of a batch of
+# announcements, in a single query.
+NAMES_QUERY = """
+SELECT 'project' AS kind, id, name FROM project WHERE id = ANY($1)
+UNION ALL
+SELECT 'collaborator' AS kind, id, name FROM collaborator WHERE id = ANY($2)
+"""
+
+
+class AnnouncementWriter:
+    """Writes the announcements of project membership changes outside of
+    the request that made the change. Requests only queue an event; a
+    worker task takes up to "batch_size" events, waiting at most
+    "flush_interval" seconds for more after the first one, and gathers
+    the changes of a user on a project made within "coalesce_window"
+    seconds of the first one. Once the window ends, their names are
+    resolved with one query and a single announcement is inserted for
+    the net changes, with one multi-row INSERT for all the due ones.
+    """
+    def __init__(
+        self,
+        crud: CRUDAnnouncement,
+        *,
+        batch_size: int,
+        flush_interval: float,
+        max_queued: int,
+        coalesce_window: float = 0
+    ) -> None:
+        self.crud = crud
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        self.coalesce_window = coalesce_window
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        # Changes gathered per (user, project), written once "due"
+        self._pending: dict = {}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def submit(
+        self,
+        user: dict,
+        project_id: int,
+        collaborator_id: int,
+        action: str
+        ) -> None:
+        """
+        Queue the announcement of a collaborator "added" to or "removed"
+        from a project by "user". Only waits when the queue is full. When
+        the worker is not running, the announcement is written right away.
+        """
+        await self.submit_many(user, project_id, [collaborator_id], action)
+
+    async def submit_many(
+        self,
+        user: dict,
+        project_id: int,
+        collaborator_ids: list[int],
+        action: str
+        ) -> None:
+        """
+        Queue a single announcement of many collaborators "added" to or
+        "removed" from a project by "user", see :meth:'submit'.
+        """
+        if not collaborator_ids:
+            return
+        event = {
+            "username": user["username"],
+            "user_id": user["id"],
+            "project_id": project_id,
+            "collaborators": dict.fromkeys(collaborator_ids, action)
+        }
+        if not self.running:
+            # As in the worker, a failed announcement must not fail the
+            # change it announces, which is already committed
+            try:
+                await self.flush([self.changes_of(event)])
+            except Exception:
+                logger.exception("Could not write 1 announcement")
+            return
+        await self._queue.put(event)
+
+    @staticmethod
+    def changes_of(event: dict) -> dict:
+        "Membership changes of a user on a project, starting with \"event\"."
+        return {
+            "username": event["username"],
+            "user_id": event["user_id"],
+            "project_id": event["project_id"],
+            "collaborators": dict(event["collaborators"])
+        }
+
+    def coalesce(self, event: dict, now: float) -> None:
+        """
+        Add "event" to the pending changes of its user and project. A
+        change that undoes a pending one of the same collaborator cancels
+        it, so only the net changes are announced.
+        """
+        if self.coalesce_window > 0:
+            key = (event["user_id"], event["project_id"])
+        else:
+            key = object()
+        changes = self._pending.get(key)
+        if changes is None:
+            changes = self.changes_of(event)
+            changes["due"] = now + self.coalesce_window
+            self._pending[key] = changes
+            return
+        collaborators = changes["collaborators"]
+        for collaborator_id, action in event["collaborators"].items():
+            if collaborators.get(collaborator_id, action) != action:
+                del collaborators[collaborator_id]
+            else:
+                collaborators[collaborator_id] = action
+
+    def due_changes(self, now: float | None = None) -> list[dict]:
+        "Take the pending changes whose window ended, or all of them."
+        due = [
+            key for key, changes in self._pending.items()
+            if now is None or changes["due"] <= now
+        ]
+        return [self._pending.pop(key) for key in due]
+
+    async def flush(self, changes: list[dict]) -> list[dict]:
+        "Write one announcement for each of the membership changes."
+        changes = [change for change in changes if change["collaborators"]]
+        if not changes:
+            return []
+        names = await self.crud.model._meta.db.execute_query_dict(
+            NAMES_QUERY,
+            [
+                list({change["project_id"] for change in changes}),
+                list({
+                    collaborator_id for change in changes
+                    for collaborator_id in change["collaborators"]
+                })
+            ]
+        )
+        names = {(row["kind"], row["id"]): row["name"] for row in names}
+        announcements = []
+        for change in changes:
+            project_name = names.get(("project", change["project_id"]),
+                change["project_id"])
+            collaborators = {
+                collaborator_id: names.get(("collaborator", collaborator_id),
+                    collaborator_id)
+                for collaborator_id in change["collaborators"]
+            }
+            if len(collaborators) == 1:
+                [(collaborator_id, action)] = change["collaborators"].items()
+                description = InfoCollaboratorAnnouncement.description(
+                    change["username"],
+                    project_name,
+                    collaborators[collaborator_id],
+                    action
+                )
+            else:
+                description = InfoCollaboratorAnnouncement.changes_description(
+                    change["username"],
+                    project_name,
+                    {
+                        action: [
+                            str(collaborators[collaborator_id])
+                            for collaborator_id, done
+                            in change["collaborators"].items()
+                            if done == action
+                        ]
+                        for action in InfoCollaboratorAnnouncement.ACTIONS
+                    }
+                )
+            announcements.append({
+                "name": await InfoCollaboratorAnnouncement.create_name(),
+                "description": description,
+                "user_id": change["user_id"]
+            })
+        return await self.crud.create_announcements(announcements)
+
+    async def _next_batch(self, timeout: float | None) -> list[dict | None]:
+        """Wait up to "timeout" seconds for an event, then take more until
+        the batch is full or due.
+        """
+        try:
+            batch = [await asyncio.wait_for(self._queue.get(), timeout)]
+        except asyncio.TimeoutError:
+            return []
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size and batch[-1] is not None:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(
+                    await asyncio.wait_for(self._queue.get(), timeout)
+                )
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        # A None event, queued by stop(), writes all the pending changes
+        # and ends the worker
+        loop = asyncio.get_running_loop()
+        while True:
+            timeout = None
+            if self._pending:
+                next_due = min(
+                    changes["due"] for changes in self._pending.values()
+                )
+                timeout = max(next_due - loop.time(), 0)
+            batch = await self._next_batch(timeout)
+            for event in batch:
+                if event is not None:
+                    self.coalesce(event, loop.time())
+            stopping = bool(batch) and batch[-1] is None
+            changes = self.due_changes(None if stopping else loop.time())
+            if changes:
+                try:
+                    await self.flush(changes)
+                except Exception:
+                    logger.exception(
+                        f"Could not write {len(changes)} announcements"
+                    )
+            if stopping:
+                return
+
+    def start(self) -> None:
+        "Start the worker task in the running event loop."
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._pending = {}
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        "Write the announcements still queued or pending and stop the worker."
+        if not self.running:
+            return
+        # From here on new announcements are written right away
+        task, self._task = self._task, None
+        await self._queue.put(None)
+        await task
+
+
+announcement_writer = AnnouncementWriter(
+    announcement,
+    batch_size=settings.ANNOUNCEMENT_BATCH_SIZE,
+    flush_interval=settings.ANNOUNCEMENT_FLUSH_SECONDS,
+    max_queued=settings.ANNOUNCEMENT_QUEUE_SIZE,
+    coalesce_window=settings.ANNOUNCEMENT_COALESCE_SECONDS
+)
@@ -1,40 +1,352 @@
-from typing import TypeVar, Generic
-from datetime import date
+from typing import Any, AsyncIterator
+from collections import defaultdict
+from datetime import date, timedelta
 
 from fastapi.encoders import jsonable_encoder
-from tortoise.models import Model
-from tortoise.functions import Count
+from tortoise.transactions import in_transaction
 
-from app.internal.CRUD.base_crud import CRUDBase
+from app.db.cursor import iterate_values
+from app.db.sql import insert_returning
+from app.internal.CRUD.base_crud import (
+    CRUDBase,
+    ConflictError,
+    UpdateSchemaType,
+    BULK_BATCH_SIZE
+)
 from app.schemas import AssignmentCreate, AssignmentUpdate
-from app.models.assignment import Assignment
 from app.models.collaborator import Collaborator as CollaboratorModel
+from app.models.project_collaborator import ProjectCollaboratorModel
 from app.models.assignment import Assignment
 
 class CollaboratorNotInProject(Exception):
     pass
 
+class AssignmentOverlap(ConflictError):
+    pass
+
 class CRUDAssignment(CRUDBase[Assignment, AssignmentCreate, AssignmentUpdate]):
+    async def overlapping(
+        self,
+        collaborator_id: int,
+        start_date: date | str,
+        final_date: date | str,
+        exclude_id: int | None = None
+        ) -> list[dict]:
+        """
+        Get the assignments of a collaborator that share at least one day
+        with the range [start_date, final_date]. Served by the
+        (collaborator_id, start_date, final_date) index.
+        """
+        query = self.model.filter(
+            collaborator_id=collaborator_id,
+            start_date__lte=final_date,
+            final_date__gte=start_date
+        )
+        if exclude_id is not None:
+            query = query.exclude(id=exclude_id)
+        return await query.order_by("start_date").values()
+
+    @staticmethod
+    async def lock_collaborators(collaborator_ids: set[int]) -> None:
+        """
+        Lock the rows of the collaborators until the current transaction
+        ends, in id order so concurrent batches do not deadlock.
+        """
+        await CollaboratorModel.select_for_update().filter(
+            id__in=collaborator_ids
+        ).order_by("id").only("id")
+
+    async def lock_assignments(self, **filters: Any) -> None:
+        """
+        Lock the assignments matching "filters" until the current
+        transaction ends, in id order. Taken before the collaborators, so
+        the rows read afterwards can not change until the update is done.
+        """
+        await self.model.select_for_update().filter(
+            **filters
+        ).order_by("id").only("id")
+
     async def create(self, assignment_in: AssignmentCreate):
         """
         The create method is overridden to verify that the collaborator
-        belongs to the project.
+        belongs to the project and is not booked in the same dates.
         In case of not belong, the exception will be raise:
         CollaboratorNotInProject
+        In case of overlapping assignments, the exception will be raise:
+        AssignmentOverlap
+        The collaborator row is locked until the assignment is saved, so
+        two concurrent requests cannot double book them.
         """
         info_assignment = jsonable_encoder(assignment_in)
         collaborator_id = info_assignment["collaborator_id"]
         project_id = info_assignment["project_id"]
-        
-        collaborator = await CollaboratorModel.get(id=collaborator_id)
-        if not await collaborator.projects.filter(id=project_id).exists():
-            raise CollaboratorNotInProject(
-                "The collaborator has not yet been assigned to the project"
+
+        async with in_transaction():
+            collaborator = await CollaboratorModel.select_for_update().get(
+                id=collaborator_id
+            )
+            if not await collaborator.projects.filter(id=project_id).exists():
+                raise CollaboratorNotInProject(
+                    "The collaborator has not yet been assigned to the project"
+                )
+
+            conflicts = await self.overlapping(
+                collaborator_id,
+                info_assignment["start_date"],
+                info_assignment["final_date"]
             )
+            if conflicts:
+                raise AssignmentOverlap(
+                    "The collaborator already has assignments in those dates",
+                    conflicts
+                )
 
-        assignment = self.model(**info_assignment)
-        await assignment.save()
+            assignment = self.model(**info_assignment)
+            await assignment.save()
+        self.invalidate_cache()
         return assignment
-    
 
-assignment = CRUDAssignment(Assignment)
+    async def batch_conflicts(
+        self,
+        assignments: list[dict],
+        exclude_ids: list[int] | None = None,
+        check_membership: bool = True
+        ) -> list[dict]:
+        """
+        Check a batch of assignments at once: one query for the project
+        memberships, one for the stored assignments that overlap them,
+        and a sort and sweep per collaborator for the overlaps inside the
+        batch. "exclude_ids" are stored assignments replaced by the batch.
+        :return: One entry per rejected assignment, with its "index" in
+        the batch, the "detail" and the "conflicts".
+        """
+        if not assignments:
+            return []
+        collaborator_ids = {a["collaborator_id"] for a in assignments}
+        memberships = None
+        if check_membership:
+            memberships = set(
+                await ProjectCollaboratorModel.filter(
+                    collaborator_id__in=collaborator_ids,
+                    project_id__in={a["project_id"] for a in assignments}
+                ).values_list("project_id", "collaborator_id")
+            )
+        query = self.model.filter(
+            collaborator_id__in=collaborator_ids,
+            start_date__lte=max(a["final_date"] for a in assignments),
+            final_date__gte=min(a["start_date"] for a in assignments)
+        )
+        if exclude_ids:
+            query = query.exclude(id__in=exclude_ids)
+        stored = await query.values()
+
+        by_collaborator = defaultdict(list)
+        for item in stored:
+            by_collaborator[item["collaborator_id"]].append((None, item))
+        errors = {}
+        for index, item in enumerate(assignments):
+            if memberships is not None and \
+                (item["project_id"], item["collaborator_id"]) not in memberships:
+                errors[index] = {
+                    "index": index,
+                    "detail": "The collaborator is not assigned to the project",
+                    "conflicts": []
+                }
+            by_collaborator[item["collaborator_id"]].append((index, item))
+
+        for items in by_collaborator.values():
+            items.sort(key=lambda entry: entry[1]["start_date"])
+            # Assignments still running at the current start date
+            running = []
+            for index, item in items:
+                running = [
+                    entry for entry in running
+                    if entry[1]["final_date"] >= item["start_date"]
+                ]
+                for other_index, other in running:
+                    for rejected, conflict in (
+                        (index, other),
+                        (other_index, item)
+                    ):
+                        if rejected is None:
+                            continue
+                        errors.setdefault(rejected, {
+                            "index": rejected,
+                            "detail": "The collaborator already has"
+                                " assignments in those dates",
+                            "conflicts": []
+                        })["conflicts"].append(conflict)
+                running.append((index, item))
+        return [errors[index] for index in sorted(errors)]
+
+    async def create_bulk(
+        self,
+        objs_in: list[AssignmentCreate],
+        batch_size: int = BULK_BATCH_SIZE
+        ) -> list[dict]:
+        """
+        The create_bulk method is overridden to apply the checks of
+        create to the whole batch. When an assignment does not pass them
+        nothing is created and the exception will be raise:
+        AssignmentOverlap, with one entry per rejected assignment.
+        The collaborators are locked until the assignments are saved.
+        """
+        assignments = [obj_in.dict() for obj_in in objs_in]
+        async with in_transaction():
+            await self.lock_collaborators(
+                {a["collaborator_id"] for a in assignments}
+            )
+            errors = await self.batch_conflicts(assignments)
+            if errors:
+                raise AssignmentOverlap(
+                    "Some assignments can not be created",
+                    errors
+                )
+            created = await insert_returning(
+                self.model,
+                [self.model(**a) for a in assignments],
+                batch_size
+            )
+        self.invalidate_cache()
+        return created
+
+    async def update_by_field(
+        self,
+        field: str,
+        value: Any,
+        obj_in: UpdateSchemaType | dict
+        ) -> dict:
+        """
+        The update_by_field method is overridden to verify that new dates
+        do not overlap other assignments of the collaborator. In that
+        case the exception will be raise: AssignmentOverlap
+        """
+        data_update = jsonable_encoder(obj_in, exclude_unset=True)
+        if not {"start_date", "final_date"} & data_update.keys():
+            return await super().update_by_field(field, value, data_update)
+
+        async with in_transaction():
+            try:
+                await self.lock_assignments(**{field: value})
+                current = await self.model.filter(**{field:value}).first().values()
+            except Exception:
+                return None
+            if not current:
+                raise Exception("The value of field doesn't exist in the database")
+
+            await CollaboratorModel.select_for_update().filter(
+                id=current["collaborator_id"]
+            ).first()
+            conflicts = await self.overlapping(
+                current["collaborator_id"],
+                data_update.get("start_date") or current["start_date"],
+                data_update.get("final_date") or current["final_date"],
+                exclude_id=current["id"]
+            )
+            if conflicts:
+                raise AssignmentOverlap(
+                    "The collaborator already has assignments in those dates",
+                    conflicts
+                )
+
+            return await super().update_by_field(field, value, data_update)
+
+    async def update_bulk(
+        self,
+        ids: list[int],
+        obj_in: UpdateSchemaType | dict
+        ) -> list[dict]:
+        """
+        The update_bulk method is overridden to verify that new dates do
+        not overlap other assignments of the collaborators, nor each
+        other. In that case nothing is updated and the exception will be
+        raise: AssignmentOverlap, with one entry per rejected assignment.
+        """
+        data_update = jsonable_encoder(obj_in, exclude_unset=True)
+        if not {"start_date", "final_date"} & data_update.keys():
+            return await super().update_bulk(ids, data_update)
+
+        new_dates = {
+            key: date.fromisoformat(data_update[key])
+            for key in ("start_date", "final_date") if key in data_update
+        }
+        async with in_transaction():
+            # Read under the lock, or a concurrent update committed in
+            # between would be checked with its stale dates
+            await self.lock_assignments(id__in=ids)
+            current = await self.model.filter(id__in=ids).order_by("id").values()
+            await self.lock_collaborators(
+                {a["collaborator_id"] for a in current}
+            )
+            errors = await self.batch_conflicts(
+                [a | new_dates for a in current],
+                exclude_ids=[a["id"] for a in current],
+                check_membership=False
+            )
+            if errors:
+                for error in errors:
+                    error["id"] = current[error.pop("index")]["id"]
+                raise AssignmentOverlap(
+                    "Some assignments can not be updated",
+                    errors
+                )
+            return await super().update_bulk(ids, data_update)
+
+    async def overallocation_report(self) -> AsyncIterator[dict]:
+        """
+        Yield one entry per collaborator booked on overlapping
+        assignments, with the number of assignments that start while an
+        earlier one is still running ("conflicts"), the number of days
+        covered by two or more assignments ("overlap_days") and the first
+        and last of those days.
+        All assignments are streamed through a server-side cursor ordered
+        by (collaborator_id, start_date) and checked with a single
+        sweep-line pass: linear time and constant memory per collaborator.
+        """
+        report = None
+        async for row in iterate_values(
+            self.model.all().order_by(
+                "collaborator_id",
+                "start_date",
+                "id"
+            ).values("collaborator_id", "start_date", "final_date")
+        ):
+            if report is None or row["collaborator_id"] != report["collaborator_id"]:
+                if report is not None and report["conflicts"]:
+                    yield report
+                report = {
+                    "collaborator_id": row["collaborator_id"],
+                    "conflicts": 0,
+                    "overlap_days": 0,
+                    "first_overlap": None,
+                    "last_overlap": None
+                }
+                # Last day covered by any assignment, and by two of them
+                reach = row["final_date"]
+                double_reach = None
+                continue
+
+            if row["start_date"] <= reach:
+                overlap_end = min(row["final_date"], reach)
+                overlap_start = row["start_date"]
+                if double_reach is not None:
+                    overlap_start = max(overlap_start, double_reach + timedelta(days=1))
+                if overlap_start <= overlap_end:
+                    report["overlap_days"] += (overlap_end - overlap_start).days + 1
+                    report["first_overlap"] = report["first_overlap"] or overlap_start
+                    report["last_overlap"] = overlap_end
+                    double_reach = overlap_end
+                report["conflicts"] += 1
+            reach = max(reach, row["final_date"])
+
+        if report is not None and report["conflicts"]:
+            yield report
+
+
+assignment = CRUDAssignment(
+    Assignment,
+    sortable=(
+        "id", "name", "start_date", "final_date", "collaborator_id",
+        "project_id"
+    )
+)
@@ -1,16 +1,129 @@
 from datetime import date
-from itertools import groupby
+from itertools import groupby, chain
+from operator import itemgetter
+from typing import AsyncIterator
 
-from tortoise.expressions import Q
-from fastapi.encoders import jsonable_encoder
+import numpy as np
 
+from app.db.cursor import iterate_rows
+from app.internal.intervals import to_day_numbers, merge_intervals, daily_counts
 from app.models.assignment import Assignment
+from app.schemas import HeatmapGroupBy
+
+# Column used to split the heatmap for each "group_by" option
+HEATMAP_GROUP_COLUMNS = {
+    HeatmapGroupBy.JOB: "c.job_id",
+    HeatmapGroupBy.PROJECT: "a.project_id"
+}
+
+# Assignments in a date range with their dates as day numbers (days since
+# 1970-01-01), so they can be loaded straight into NumPy arrays.
+HEATMAP_QUERY = """
+SELECT a.collaborator_id,
+       a.start_date - DATE '1970-01-01',
+       a.final_date - DATE '1970-01-01',
+       {group_column}
+FROM assignment a
+JOIN collaborator c ON c.id = a.collaborator_id
+WHERE a.start_date <= $2 AND a.final_date >= $1
+"""
+
+# Every assignment in a project of the collaborators whose job has at
+# least one assignment in the project valid during the date range, joined
+# with its collaborator, job and project. "in_range" tells the ones valid
+# during the range. Rows are ordered by project so they can be grouped in
+# a single pass.
+CALENDAR_QUERY = """
+WITH implicated AS (
+    SELECT DISTINCT a.project_id, c.job_id
+    FROM assignment a
+    JOIN collaborator c ON c.id = a.collaborator_id
+    WHERE a.start_date <= $2 AND a.final_date >= $1
+)
+SELECT a.project_id,
+       a.collaborator_id,
+       a.id,
+       a.start_date,
+       a.final_date,
+       a.name,
+       a.start_date <= $2 AND a.final_date >= $1 AS in_range,
+       p.name AS project_name,
+       c.name AS collaborator_name,
+       c.last_name AS collaborator_last_name,
+       j.id AS job_id,
+       j.name AS job_name
+FROM implicated
+JOIN collaborator c ON c.job_id = implicated.job_id
+JOIN assignment a ON a.collaborator_id = c.id
+    AND a.project_id = implicated.project_id
+JOIN project p ON p.id = a.project_id
+JOIN job j ON j.id = c.job_id
+ORDER BY a.project_id, a.collaborator_id, a.start_date, a.id
+"""
+
+# Columns of an assignment that are returned inside each collaborator
+ASSIGNMENT_FIELDS = (
+    "project_id",
+    "collaborator_id",
+    "id",
+    "start_date",
+    "final_date",
+    "name"
+)
 
 
 class AssignmentCalendar():
     def __init__(self, model: Assignment):
         self.model = model
 
+    @staticmethod
+    def group_project(project_rows: list[dict]) -> dict:
+        """
+        Build the calendar entry of one project from its assignment rows.
+        Jobs and collaborators keep the order in which they first appear.
+        The dates of a job only span its assignments valid in the range.
+        """
+        project_group = {}
+        project_group["project_id"] = project_rows[0]["project_id"]
+        project_group["project_name"] = project_rows[0]["project_name"]
+        jobs = {}
+        for row in project_rows:
+            info_job = jobs.get(row["job_id"])
+            if info_job is None:
+                info_job = jobs[row["job_id"]] = {
+                    "start_date": None,
+                    "end_date": None,
+                    "job_id": row["job_id"],
+                    "job_name": row["job_name"],
+                    "collaborators": {}
+                }
+            if row["in_range"]:
+                info_job["start_date"] = min(
+                    info_job["start_date"] or row["start_date"],
+                    row["start_date"]
+                )
+                info_job["end_date"] = max(
+                    info_job["end_date"] or row["final_date"],
+                    row["final_date"]
+                )
+
+            collaborator_info = info_job["collaborators"].get(row["collaborator_id"])
+            if collaborator_info is None:
+                collaborator_info = info_job["collaborators"][row["collaborator_id"]] = {
+                    "id": row["collaborator_id"],
+                    "name": row["collaborator_name"],
+                    "lastname": row["collaborator_last_name"],
+                    "assignments": []
+                }
+            collaborator_info["assignments"].append(
+                {field: row[field] for field in ASSIGNMENT_FIELDS}
+            )
+
+        for info_job in jobs.values():
+            info_job["collaborators"] = list(info_job["collaborators"].values())
+        project_group["jobs_implicated"] = list(jobs.values())
+        return project_group
+
     async def calendar(self, start_filter: date, final_filter:date):
         """
         Method to build the assignment calendar.
@@ -20,44 +133,103 @@ class AssignmentCalendar():
         :return: List of assignments that are valid during the date
         range between the start_date and final_date parameters.
         Assignments will be grouped by project, by job, and by
-        collaborator. Check below sample response for a better
+        collaborator. Each job lists its collaborators with at least
+        one assignment in the project, with all of their assignments in
+        the project. Everything is loaded with a single query and
+        grouped in memory. Check below sample response for a better
         understanding
         """
-        assignments = await self.model.filter(
-            start_date__lte=final_filter,
-            final_date__gte=start_filter
-        ).prefetch_related("collaborator__job", "project").all().order_by("project_id")
-        grouped_assignments = []
-        for project, project_assignments in groupby(assignments, lambda x: x.project):
-            project_group = {}
-            project_group["project_id"] = project.id
-            project_group["project_name"] = project.name
-            project_group["jobs_implicated"] = []
-            for job, job_assignments in groupby(project_assignments, lambda x: x.collaborator.job):
-                info_job = {}
-                copy_job_assignments = list(job_assignments)
-                info_job["start_date"] = min([job.start_date for job in copy_job_assignments])
-                info_job["end_date"] = max([job.final_date for job in copy_job_assignments])
-                info_job["job_id"] = job.id
-                info_job["job_name"] = job.name
-                info_job["collaborators"] = []
-                await job.fetch_related('collaborators')
-                collaborators = job.collaborators
-                for collaborator in collaborators:
-                    await collaborator.fetch_related("assignments")
-                    collaborator_info = {}
-                    collaborator_info["id"] = collaborator.id
-                    collaborator_info["name"] = collaborator.name
-                    collaborator_info["lastname"] = collaborator.last_name
-                    collaborator_info["assignments"] = [
-                    assignment for assignment
-                    in collaborator.assignments
-                    if assignment.project_id == project.id
-                    ]
-                    info_job["collaborators"].append(collaborator_info)
-                project_group["jobs_implicated"].append(info_job)
-            grouped_assignments.append(project_group)
-        return grouped_assignments
+        assignments = await self.model._meta.db.execute_query_dict(
+            CALENDAR_QUERY,
+            [start_filter, final_filter]
+        )
+        return [
+            self.group_project(list(project_assignments))
+            for _, project_assignments
+            in groupby(assignments, itemgetter("project_id"))
+        ]
+
+    async def calendar_stream(
+        self,
+        start_filter: date,
+        final_filter: date
+        ) -> AsyncIterator[dict]:
+        """
+        Same result as "calendar", but yields one project group at a time.
+        Rows are read through a server-side cursor ordered by project, so
+        memory is bounded by the largest project instead of the whole
+        date range.
+        """
+        project_rows = []
+        async for row in iterate_rows(
+            self.model._meta.db,
+            CALENDAR_QUERY,
+            [start_filter, final_filter]
+        ):
+            if project_rows and row["project_id"] != project_rows[0]["project_id"]:
+                yield self.group_project(project_rows)
+                project_rows = []
+            project_rows.append(row)
+        if project_rows:
+            yield self.group_project(project_rows)
+
+    async def heatmap(
+        self,
+        start_filter: date,
+        final_filter: date,
+        group_by: HeatmapGroupBy | None = None
+        ) -> dict:
+        """
+        Number of collaborators booked on each day of the date range,
+        optionally split by job or by project. A collaborator with
+        overlapping assignments is counted once per day (and group).
+        Assignments are loaded in one query and the counting is done with
+        NumPy interval arithmetic.
+        """
+        group_column = HEATMAP_GROUP_COLUMNS.get(group_by, "0")
+        _, rows = await self.model._meta.db.execute_query(
+            HEATMAP_QUERY.format(group_column=group_column),
+            [start_filter, final_filter]
+        )
+        columns = np.fromiter(
+            chain.from_iterable(rows),
+            dtype=np.int64,
+            count=4 * len(rows)
+        ).reshape(len(rows), 4).T
+        collaborators, starts, finals, groups = columns
+
+        first_day, last_day = to_day_numbers([start_filter, final_filter])
+        if group_by is None:
+            group_ids = [None]
+            group_rows = groups
+        else:
+            group_ids, group_rows = np.unique(groups, return_inverse=True)
+            group_ids = group_ids.tolist()
+
+        # Merge per (group, collaborator) so each person counts once a day
+        stride = collaborators.max(initial=0) + 1
+        keys, starts, finals = merge_intervals(
+            group_rows * stride + collaborators,
+            starts,
+            finals
+        )
+        counts = daily_counts(
+            keys // stride,
+            starts,
+            finals,
+            first_day,
+            last_day,
+            len(group_ids)
+        )
+        return {
+            "start_date": start_filter,
+            "final_date": final_filter,
+            "group_by": group_by,
+            "series": [
+                {"id": group_id, "headcount": headcount}
+                for group_id, headcount in zip(group_ids, counts.tolist())
+            ]
+        }
 
 
 assignment_calendar = AssignmentCalendar(Assignment)
@@ -1,9 +1,62 @@
+import base64
+import heapq
 from typing import Any
+from datetime import date, timedelta
+from itertools import groupby
+from operator import itemgetter
 
+import numpy as np
+
+from app.core.cache import entity_cache
 from app.internal.CRUD.base_crud import CRUDBase
-from app.schemas import CollaboratorCreate, CollaboratorUpdate
+from app.internal.intervals import to_day_numbers, daily_counts
+from app.schemas import CollaboratorCreate, CollaboratorUpdate, AvailabilityEncoding
 from app.models.collaborator import Collaborator
 
+# Collaborators of a job without any assignment overlapping the window
+# [$2, $3]. Served by the (collaborator_id, start_date, final_date) index
+# of the assignment table.
+AVAILABILITY_QUERY = """
+SELECT c.*
+FROM collaborator c
+WHERE c.job_id = $1
+  AND NOT EXISTS (
+    SELECT 1
+    FROM assignment a
+    WHERE a.collaborator_id = c.id
+      AND a.start_date <= $3
+      AND a.final_date >= $2
+  )
+ORDER BY c.id
+"""
+
+# Collaborators of a job with their assignments ending on or after $2,
+# sorted so each collaborator's intervals can be swept in order.
+FREE_WINDOWS_QUERY = """
+SELECT c.id, c.name, c.last_name, a.start_date, a.final_date
+FROM collaborator c
+LEFT JOIN assignment a
+  ON a.collaborator_id = c.id AND a.final_date >= $2
+WHERE c.job_id = $1
+ORDER BY c.id, a.start_date
+"""
+
+# Collaborators of a job or department ({filter_column} = $1) with their
+# assignments overlapping [$2, $3], dates as day numbers since 1970-01-01.
+AVAILABILITY_MATRIX_QUERY = """
+SELECT c.id, c.name, c.last_name,
+       a.start_date - DATE '1970-01-01' AS start_day,
+       a.final_date - DATE '1970-01-01' AS final_day
+FROM collaborator c
+JOIN job j ON j.id = c.job_id
+LEFT JOIN assignment a
+  ON a.collaborator_id = c.id
+  AND a.start_date <= $3
+  AND a.final_date >= $2
+WHERE {filter_column} = $1
+ORDER BY c.id
+"""
+
 
 class CRUDCollaborator(CRUDBase[Collaborator, CollaboratorCreate, CollaboratorUpdate]):
     async def count_by_field(
@@ -29,27 +82,146 @@ class CRUDCollaborator(CRUDBase[Collaborator, CollaboratorCreate, CollaboratorUp
         assignments = await collaborator.assignments.all()
         return assignments
 
-    async def filter_availability(self, date, job_id):
+    async def filter_availability(self, date, job_id, final_date=None):
         """
         Filter collaborators available for a specific day (that is,
         they do not have current assignments that day), based on their
-        job_id.
-        """
-        collaborators_job = await self.model.filter(
-            job_id=job_id
-            ).prefetch_related("assignments").all()
-        collaborators_avability = []
-        for collaborator in collaborators_job:
-            avalability = True
-            for assignment in collaborator.assignments:
-                if assignment.start_date <= date <= assignment.final_date:
-                    avalability = False
+        job_id. When "final_date" is given, only collaborators free for
+        the whole window between "date" and "final_date" are returned.
+        Runs as a single anti-join (NOT EXISTS) query.
+        """
+        return await self.model._meta.db.execute_query_dict(
+            AVAILABILITY_QUERY,
+            [job_id, date, final_date or date]
+        )
+
+    async def find_free_windows(
+        self,
+        job_id: int,
+        after: date,
+        days: int,
+        limit: int
+        ) -> list[dict]:
+        """
+        Find, for each collaborator of a job, the earliest window of at
+        least "days" consecutive free days starting on or after "after",
+        and return the "limit" earliest ones.
+        Each collaborator's assignments are swept in start order, keeping
+        the first free day after the intervals seen so far. One query plus
+        O(n log n) work.
+        :return: List of windows with the collaborator info, "start_date"
+        and "final_date" (None when the collaborator is free from
+        "start_date" on).
+        """
+        rows = await self.model._meta.db.execute_query_dict(
+            FREE_WINDOWS_QUERY,
+            [job_id, after]
+        )
+        windows = []
+        for _, collaborator_rows in groupby(rows, itemgetter("id")):
+            collaborator_rows = list(collaborator_rows)
+            free_from = after
+            free_until = None
+            for row in collaborator_rows:
+                if row["start_date"] is None:
                     break
-            if avalability:
-                collaborators_avability.append(collaborator)
-        
-        return collaborators_avability
+                if (row["start_date"] - free_from).days >= days:
+                    free_until = row["start_date"] - timedelta(days=1)
+                    break
+                free_from = max(
+                    free_from,
+                    row["final_date"] + timedelta(days=1)
+                )
+            windows.append({
+                "id": collaborator_rows[0]["id"],
+                "name": collaborator_rows[0]["name"],
+                "last_name": collaborator_rows[0]["last_name"],
+                "start_date": free_from,
+                "final_date": free_until
+            })
+
+        return heapq.nsmallest(
+            limit,
+            windows,
+            key=itemgetter("start_date", "id")
+        )
+
+    async def availability_matrix(
+        self,
+        start_date: date,
+        final_date: date,
+        *,
+        job_id: int | None = None,
+        department_id: int | None = None,
+        encoding: AvailabilityEncoding = AvailabilityEncoding.BITS
+        ) -> dict:
+        """
+        Availability of every collaborator of a job (or of a department)
+        for each day between start_date and final_date.
+        The collaborator x day grid is computed from one query with NumPy
+        boolean arrays, and each row is returned either as "bits" (base64
+        of the packed bits, most significant bit first, 1 meaning free)
+        or as "free_runs" (list of [first day offset, length] of the free
+        periods).
+        """
+        if job_id is not None:
+            filter_column, filter_value = "c.job_id", job_id
+        else:
+            filter_column, filter_value = "j.department_id", department_id
+        rows = await self.model._meta.db.execute_query_dict(
+            AVAILABILITY_MATRIX_QUERY.format(filter_column=filter_column),
+            [filter_value, start_date, final_date]
+        )
+        collaborators = {}
+        for row in rows:
+            collaborators.setdefault(row["id"], {
+                "id": row["id"],
+                "name": row["name"],
+                "last_name": row["last_name"]
+            })
+
+        first_day, last_day = to_day_numbers([start_date, final_date])
+        booked_rows = [row for row in rows if row["start_day"] is not None]
+        row_index = {collaborator_id: index for index, collaborator_id
+                     in enumerate(collaborators)}
+        booked = daily_counts(
+            np.array([row_index[row["id"]] for row in booked_rows], dtype=np.int64),
+            np.array([row["start_day"] for row in booked_rows], dtype=np.int64),
+            np.array([row["final_day"] for row in booked_rows], dtype=np.int64),
+            first_day,
+            last_day,
+            len(collaborators)
+        ) > 0
+        free = ~booked
+
+        if encoding == AvailabilityEncoding.BITS:
+            packed = np.packbits(free, axis=1)
+            for info, bits in zip(collaborators.values(), packed):
+                info["bits"] = base64.b64encode(bits.tobytes()).decode()
+        else:
+            # Free runs start where the padded row goes from 0 to 1 and
+            # end where it goes from 1 to 0
+            padded = np.zeros((len(collaborators), free.shape[1] + 2), dtype=np.int8)
+            padded[:, 1:-1] = free
+            changes = np.diff(padded, axis=1)
+            for index, info in enumerate(collaborators.values()):
+                starts = np.flatnonzero(changes[index] == 1)
+                ends = np.flatnonzero(changes[index] == -1)
+                info["free_runs"] = np.column_stack((starts, ends - starts)).tolist()
+
+        return {
+            "start_date": start_date,
+            "final_date": final_date,
+            "days": int(last_day - first_day + 1),
+            "encoding": encoding,
+            "collaborators": list(collaborators.values())
+        }
 
-                
 
-collaborator = CRUDCollaborator(Collaborator)
\ No newline at end of file
+collaborator = CRUDCollaborator(
+    Collaborator,
+    cache=entity_cache("collaborator"),
+    sortable=(
+        "id", "name", "last_name", "gender", "age", "is_active", "job_id"
+    )
+)
\ No newline at end of file
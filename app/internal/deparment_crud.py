@@ -1,9 +1,34 @@
+from typing import Any
+
+from app.core.cache import entity_cache
+from app.core.security.revocation import token_versions
 from app.internal.CRUD.base_crud import CRUDBase
+from app.internal.job_crud import job
+from app.internal.user_crud import user
 from app.schemas import DepartmentCreate, DepartmentUpdate
 from app.models.department import Department
 
 
 class CRUDDepartment(CRUDBase[Department, DepartmentCreate, DepartmentUpdate]):
-    pass
+    """The deletes are overridden to read the token versions again, since
+    the users of the deleted departments are deleted in cascade.
+    """
+    async def remove_by_field(self, field: str, value: Any) -> dict:
+        deleted = await super().remove_by_field(field, value)
+        if deleted:
+            token_versions.invalidate()
+        return deleted
+
+    async def remove_bulk(self, ids: list[int]) -> list[dict]:
+        deleted = await super().remove_bulk(ids)
+        if deleted:
+            token_versions.invalidate()
+        return deleted
 
-deparment = CRUDDepartment(Department)
\ No newline at end of file
+# The jobs and users of a department are deleted in cascade with it
+deparment = CRUDDepartment(
+    Department,
+    cache=entity_cache("department"),
+    cascade=(job, user),
+    sortable=("id", "name")
+)
\ No newline at end of file
@@ -1,6 +1,4 @@
 from abc import ABC, abstractmethod
-from app.models.project import Project as ProjectModel
-from app.models.collaborator import Collaborator as CollaboratorModel
 
 class IInfoAnnouncement(ABC):
     """Interface for classes in charge of creating information for
@@ -25,27 +23,34 @@ class InfoCollaboratorAnnouncement(IInfoAnnouncement):
     async def create_name():
         return "The collaborators of a project have been modified"
 
+    # Preposition that goes with each action
+    ACTIONS = {"added": "to", "removed": "from"}
+
     @staticmethod
-    async def create_description(
-        user: dict,
-        project_id: int,
-        collaborator_id: int,
+    def description(
+        username: str,
+        project_name: str,
+        collaborator_name: str,
         action: str
-        ):
-        username = user["username"]
-        project = await ProjectModel.filter(id=project_id).first()
-        project_name = project.name
-
-        collaborator = await CollaboratorModel.filter(
-            id=collaborator_id
-            ).first()
-        collaborator_name = collaborator.name
-
+        ) -> str:
+        "Description of the announcement once the names are known."
+        preposition = InfoCollaboratorAnnouncement.ACTIONS.get(action, "in")
         return f"The user:{username} has {action} collaborator:{collaborator_name}"\
-            f" to the project:{project_name}"
-        
-        
-    
-
-        
+            f" {preposition} the project:{project_name}"
 
+    @staticmethod
+    def changes_description(
+        username: str,
+        project_name: str,
+        changes: dict[str, list[str]]
+        ) -> str:
+        """Description of the announcement of several collaborators added
+        to or removed from a project, "changes" maps each action to the
+        names of its collaborators.
+        """
+        actions = "; ".join(
+            f"{action} {', '.join(names)}"
+            for action, names in changes.items() if names
+        )
+        return f"The user:{username} has modified the collaborators of the"\
+            f" project:{project_name}: {actions}"
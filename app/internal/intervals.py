@@ -0,0 +1,80 @@
+import numpy as np
+
+# Vectorized helpers to work with closed date intervals [start, final].
+# Dates are handled as integer day numbers (days since 1970-01-01) so
+# every operation runs over NumPy arrays instead of Python loops.
+
+
+def to_day_numbers(dates) -> np.ndarray:
+    "Convert a sequence of dates into an array of integer day numbers."
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def merge_intervals(
+    keys: np.ndarray,
+    starts: np.ndarray,
+    finals: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Merge the overlapping intervals that share the same key, e.g. the
+    assignments of one collaborator, so every day is counted once per
+    key.
+    :return: Keys, starts and finals of the merged intervals, sorted by
+    key and start.
+    """
+    if len(keys) == 0:
+        return keys, starts, finals
+    _, key_rank = np.unique(keys, return_inverse=True)
+    # Shift each key to its own region of the number line, so a single
+    # running maximum never carries an interval over to the next key.
+    lowest = starts.min()
+    shift = (finals.max() - lowest + 2) * key_rank
+    shifted_starts = starts - lowest + shift
+    shifted_finals = finals - lowest + shift
+
+    order = np.lexsort((shifted_starts, key_rank))
+    shifted_starts = shifted_starts[order]
+    shifted_finals = shifted_finals[order]
+
+    reach = np.maximum.accumulate(shifted_finals)
+    new_interval = np.ones(len(order), dtype=bool)
+    new_interval[1:] = shifted_starts[1:] > reach[:-1]
+    first_rows = np.flatnonzero(new_interval)
+
+    merged_finals = np.maximum.reduceat(shifted_finals, first_rows)
+    rows = order[first_rows]
+    return (
+        keys[rows],
+        starts[rows],
+        merged_finals - shift[rows] + lowest
+    )
+
+
+def daily_counts(
+    groups: np.ndarray,
+    starts: np.ndarray,
+    finals: np.ndarray,
+    first_day: int,
+    last_day: int,
+    n_groups: int
+    ) -> np.ndarray:
+    """
+    Count, for every group and every day between first_day and last_day,
+    how many intervals cover that day. "groups" holds the row (0 to
+    n_groups - 1) of each interval.
+    Uses a difference array: +1 where an interval starts and -1 the day
+    after it ends, followed by a cumulative sum along the days.
+    :return: Integer matrix with shape (n_groups, number of days).
+    """
+    n_days = last_day - first_day + 1
+    width = n_days + 1
+    begin = np.clip(starts, first_day, last_day + 1) - first_day
+    end = np.clip(finals, first_day - 1, last_day) - first_day + 1
+    valid = begin < end
+    offsets = groups[valid] * width
+    size = n_groups * width
+    difference = (
+        np.bincount(offsets + begin[valid], minlength=size)
+        - np.bincount(offsets + end[valid], minlength=size)
+    )
+    return np.cumsum(difference.reshape(n_groups, width), axis=1)[:, :-1]
@@ -1,3 +1,4 @@
+from app.core.cache import entity_cache
 from app.internal.CRUD.base_crud import CRUDBase
 from app.schemas import JobCreate, JobUpdate
 from app.models.job import Job
@@ -13,4 +14,8 @@ class CRUDJob(CRUDBase[Job, JobCreate, JobUpdate]):
         collaborators = await job.collaborators.all()
         return collaborators
 
-job = CRUDJob(Job)
\ No newline at end of file
+job = CRUDJob(
+    Job,
+    cache=entity_cache("job"),
+    sortable=("id", "name", "department_id")
+)
\ No newline at end of file
@@ -2,6 +2,28 @@ from tortoise.models import Model
 
 from app.models.project_collaborator import ProjectCollaboratorModel
 
+# Adds the collaborators ($2) that exist to the project ($1), skipping the
+# ones already in it, and tells for each existing collaborator whether it
+# was added.
+ADD_MANY_QUERY = """
+WITH requested AS (
+    SELECT id FROM collaborator WHERE id = ANY($2)
+), added AS (
+    INSERT INTO project_collaborator (project_id, collaborator_id)
+    SELECT $1, id FROM requested
+    ON CONFLICT (project_id, collaborator_id) DO NOTHING
+    RETURNING collaborator_id
+)
+SELECT requested.id, added.collaborator_id IS NOT NULL AS added
+FROM requested LEFT JOIN added ON added.collaborator_id = requested.id
+"""
+
+REMOVE_MANY_QUERY = """
+DELETE FROM project_collaborator
+WHERE project_id = $1 AND collaborator_id = ANY($2)
+RETURNING collaborator_id
+"""
+
 
 class ProjectCollaborator():
     def __init__(self, model: Model):
@@ -38,5 +60,55 @@ class ProjectCollaborator():
         await db_obj.delete()
         return db_obj
 
+    async def add_collaborators(
+        self,
+        project_id: int,
+        collaborator_ids: list[int]
+        ) -> list[dict]:
+        """
+        Add many collaborators to a project with a single statement.
+        :return: The outcome for each id, in the same order: "added",
+        "already_member" or "not_found" when the collaborator does not
+        exist.
+        """
+        rows = await self.model._meta.db.execute_query_dict(
+            ADD_MANY_QUERY,
+            [project_id, collaborator_ids]
+        )
+        added = {row["id"]: row["added"] for row in rows}
+        return [
+            {
+                "collaborator_id": collaborator_id,
+                "status": "not_found" if collaborator_id not in added
+                    else "added" if added[collaborator_id]
+                    else "already_member"
+            }
+            for collaborator_id in collaborator_ids
+        ]
+
+    async def remove_collaborators(
+        self,
+        project_id: int,
+        collaborator_ids: list[int]
+        ) -> list[dict]:
+        """
+        Remove many collaborators from a project with a single statement.
+        :return: The outcome for each id, in the same order: "removed" or
+        "not_member".
+        """
+        rows = await self.model._meta.db.execute_query_dict(
+            REMOVE_MANY_QUERY,
+            [project_id, collaborator_ids]
+        )
+        removed = {row["collaborator_id"] for row in rows}
+        return [
+            {
+                "collaborator_id": collaborator_id,
+                "status": "removed" if collaborator_id in removed
+                    else "not_member"
+            }
+            for collaborator_id in collaborator_ids
+        ]
+
 
 project_collaborator_obj = ProjectCollaborator(ProjectCollaboratorModel)
\ No newline at end of file
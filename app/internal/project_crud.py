@@ -1,3 +1,4 @@
+from app.core.cache import entity_cache
 from app.internal.CRUD.base_crud import CRUDBase
 from app.schemas import ProjectCreate, ProjectUpdate
 from app.models.project import Project
@@ -23,4 +24,8 @@ class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
         return assignments
 
 
-project = CRUDProject(Project)
+project = CRUDProject(
+    Project,
+    cache=entity_cache("project"),
+    sortable=("id", "name", "customer", "start_date", "final_date")
+)
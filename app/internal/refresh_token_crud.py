@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from tortoise.models import Model
+
+from app.config import settings
+from app.models.refresh_token import RefreshToken
+
+# Replaces the token id of a live session, only if the presented token is
+# the last one issued to it. Rotation and check in a single statement.
+ROTATE_QUERY = """
+UPDATE refresh_token
+SET jti = $3
+WHERE family = $1 AND jti = $2 AND expires_at > now()
+RETURNING user_id, expires_at
+"""
+
+
+class InvalidRefreshToken(Exception):
+    pass
+
+
+class CRUDRefreshToken():
+    def __init__(self, model: Model):
+        """Object in charge of the refresh token sessions: issue them at
+        login, rotate them and revoke them.
+        **Parameters**
+        * `model`: A Tortoise ORM model class
+        """
+        self.model = model
+
+    async def create_session(self, user_id: int) -> dict:
+        """
+        Open a new session for the user, and drop the expired sessions of
+        the user.
+        :return: The "family", "jti" and "expires_at" of the first token.
+        """
+        now = datetime.now(timezone.utc)
+        await self.model.filter(user_id=user_id, expires_at__lte=now).delete()
+        session = self.model(
+            family=uuid4().hex,
+            jti=uuid4().hex,
+            expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+            user_id=user_id
+        )
+        await session.save()
+        return {
+            "family": session.family,
+            "jti": session.jti,
+            "expires_at": session.expires_at
+        }
+
+    async def rotate(self, family: str, jti: str) -> dict:
+        """
+        Exchange the token "jti" of the session "family" for a new one.
+        When "jti" is not the last token of the session, it was already
+        used: the token may have been stolen, so the session is revoked.
+        In that case, or when the session expired or does not exist, the
+        exception will be raise: InvalidRefreshToken
+        :return: The "user_id", "family", "jti" and "expires_at" of the
+        new token.
+        """
+        new_jti = uuid4().hex
+        rotated = await self.model._meta.db.execute_query_dict(
+            ROTATE_QUERY,
+            [family, jti, new_jti]
+        )
+        if not rotated:
+            await self.model.filter(family=family).delete()
+            raise InvalidRefreshToken("The refresh token is not valid")
+        return {
+            "user_id": rotated[0]["user_id"],
+            "family": family,
+            "jti": new_jti,
+            "expires_at": rotated[0]["expires_at"]
+        }
+
+    async def revoke_user(self, user_id: int) -> int:
+        "Close every session of the user, e.g. after a password change."
+        return await self.model.filter(user_id=user_id).delete()
+
+
+refresh_token = CRUDRefreshToken(RefreshToken)
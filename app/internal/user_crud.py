@@ -2,25 +2,46 @@ from typing import Optional, Any
 
 from fastapi.encoders import jsonable_encoder
 
-from app.internal.CRUD.base_crud import CRUDBase
+from app import schemas
+from app.config import settings
+from app.core.cache import entity_cache
+from app.internal.CRUD.base_crud import CRUDBase, BULK_BATCH_SIZE
 from app.schemas import UserCreate, UserUpdate
 from app.models.user import User
 from app.internal.CRUD.base_crud import ModelType, CreateSchemaType, UpdateSchemaType
 from app.core.security.pwd import password_hash
+from app.core.security.revocation import token_versions
+from app.internal.refresh_token_crud import refresh_token
  
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
+    """The writes are overridden to keep the token versions of the
+    written users up to date: a new password or role revokes the tokens
+    issued before, and so does deleting the user.
+    """
     async def create(self, obj_in: CreateSchemaType) -> ModelType:
         """The create method is overridden to include password
         encryption.
         """
         obj_in_data = jsonable_encoder(obj_in)
         if 'password' in obj_in_data:
-            obj_in_data['password'] = password_hash(obj_in_data['password'])
+            obj_in_data['password'] = await password_hash(obj_in_data['password'])
         db_obj = self.model(**obj_in_data)
         await db_obj.save()
+        self.invalidate_cache()
+        token_versions.set(dict(db_obj))
         return db_obj
 
+    async def create_bulk(
+        self,
+        objs_in: list[CreateSchemaType],
+        batch_size: int = BULK_BATCH_SIZE
+        ) -> list[dict]:
+        created = await super().create_bulk(objs_in, batch_size)
+        for db_obj in created:
+            token_versions.set(db_obj)
+        return created
+
     async def update_by_field(
         self,
         field: str,
@@ -28,25 +49,48 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         obj_in: UpdateSchemaType | dict
         ) -> dict:
         """The update_by_field method is overridden to include password
-        encryption.
+        encryption. A new password closes every login session of the
+        user, so their refresh tokens are no longer valid.
         Returns 'None' when :attr:'CRUDBase.model' does not have attribute
         'field'.
         """
         data_update = jsonable_encoder(obj_in, exclude_unset=True)
         if 'password' in data_update:
-            data_update['password'] = password_hash(data_update['password'])
-        try:
-            db_obj_update = await self.model.filter(**{field:value})\
-            .update(**data_update)   
-        except Exception:
-            return None
-        
-        """Raise Exception when the "value" of field does not exist in the 
-        database"""
-        if not db_obj_update:
-            raise Exception
-        else:
-            return data_update
-    
-user = CRUDUser(User)
+            data_update['password'] = await password_hash(data_update['password'])
+        updated = await super().update_by_field(field, value, data_update)
+        if updated:
+            token_versions.set(updated)
+        if updated and 'password' in data_update:
+            await refresh_token.revoke_user(updated['id'])
+        return updated
+
+    async def remove_by_field(self, field: str, value: Any) -> dict:
+        deleted = await super().remove_by_field(field, value)
+        if deleted:
+            token_versions.discard(deleted['id'])
+        return deleted
+
+    async def update_bulk(
+        self,
+        ids: list[int],
+        obj_in: UpdateSchemaType | dict
+        ) -> list[dict]:
+        updated = await super().update_bulk(ids, obj_in)
+        for db_obj in updated:
+            token_versions.set(db_obj)
+        return updated
+
+    async def remove_bulk(self, ids: list[int]) -> list[dict]:
+        deleted = await super().remove_bulk(ids)
+        for db_obj in deleted:
+            token_versions.discard(db_obj['id'])
+        return deleted
+
+# Serves the user of every authenticated request (see get_current_user)
+user = CRUDUser(
+    User,
+    cache=entity_cache("user", ttl=settings.PRINCIPAL_CACHE_TTL),
+    sortable=("id", "username", "email", "role", "department_id"),
+    public_fields=tuple(schemas.User.__fields__)
+)
 
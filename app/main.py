@@ -4,7 +4,11 @@ from fastapi import FastAPI
 
 from app.db.database import init_db
 from app.api.api import api_router
+from app.config import settings
+from app.core.security.revocation import token_versions
 from app.db.first_records import first_records
+from app.internal.announcement_archiver import announcement_archiver
+from app.internal.announcement_writer import announcement_writer
 
 log = logging.getLogger("uvicorn")
 
@@ -19,15 +23,24 @@ def create_app() -> FastAPI:
 
 # Main app
 app = create_app()
+# Integrating Tortoise-ORM. Registered before startup_event, so the
+# database is ready when it runs
+init_db(app)
 
 @app.on_event("startup")
 async def startup_event():
     log.info("Starting up...")
-    "Integrating Tortoise-ORM"
-    init_db(app)
     #await first_records()
+    if settings.AUTH_MODE == "stateless":
+        "Reading the token versions of the users"
+        await token_versions.load()
+    announcement_writer.start()
+    announcement_archiver.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    log.info("Shutting down...")
\ No newline at end of file
+    log.info("Shutting down...")
+    "Writing the queued announcements"
+    await announcement_writer.stop()
+    await announcement_archiver.stop()
\ No newline at end of file
@@ -15,5 +15,27 @@ class Announcement(Base):
         on_delete=fields.CASCADE
     )
 
+    # Serves the date ranges, paginated by (date, id). Databases created
+    # before it need the statement in the README
+    class Meta:
+        indexes = (("date", "id"),)
 
 
+class AnnouncementArchive(Base):
+    """Announcements older than the retention window, moved out of the
+    "announcement" table with their original id and date.
+    """
+    id = fields.IntField(pk=True, generated=False)
+    name = fields.CharField(max_length=64, null=False)
+    description = fields.TextField()
+    date = fields.DatetimeField()
+
+    user = fields.ForeignKeyField(
+        "models.User",
+        related_name="archived_announcements",
+        on_delete=fields.CASCADE
+    )
+
+    class Meta:
+        table = "announcement_archive"
+        indexes = (("date", "id"),)
@@ -22,3 +22,6 @@ class Assignment(Base):
         on_delete=fields.CASCADE
     )
 
+    # Serves the overlap lookups of a collaborator's assignments by date
+    class Meta:
+        indexes = (("collaborator_id", "start_date", "final_date"),)
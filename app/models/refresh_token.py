@@ -0,0 +1,23 @@
+from tortoise import fields
+
+from app.models.base_class import Base
+
+
+class RefreshToken(Base):
+    """One row per login session ("family"). Only the last refresh token
+    issued to the session is valid: its id is kept in "jti" and replaced
+    on each rotation.
+    """
+    family = fields.CharField(max_length=32, unique=True)
+    jti = fields.CharField(max_length=32)
+    expires_at = fields.DatetimeField()
+
+    # ORM relationship between RefreshToken and User entity
+    user = fields.ForeignKeyField(
+        "models.User",
+        related_name="refresh_tokens",
+        on_delete=fields.CASCADE
+    )
+
+    class Meta:
+        table = 'refresh_token'
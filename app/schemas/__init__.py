@@ -1,8 +1,9 @@
-from .security import Token, TokenData
+from .security import Token, TokenData, RefreshTokenIn
 from .user import User, UserCreate, UserUpdate, UserInDBBase
 from .department import Department, DepartmentCreate, DepartmentUpdate, DepartmentInDBBase
 from .job import Job, JobCreate, JobUpdate, JobInDBBase
-from .collaborator import Collaborator, CollaboratorCreate, CollaboratorUpdate, CollaboratorInDBBase
-from .project import Project, ProjectCreate, ProjectUpdate, ProjectInDBBase
-from .assignment import Assignment, AssignmentCreate, AssignmentUpdate
-from .announcement import Announcement, AnnouncementCreate
\ No newline at end of file
+from .collaborator import Collaborator, CollaboratorCreate, CollaboratorUpdate, CollaboratorInDBBase, CollaboratorFreeWindow, AvailabilityEncoding, AvailabilityMatrix
+from .project import Project, ProjectCreate, ProjectUpdate, ProjectInDBBase, MembershipResult
+from .assignment import Assignment, AssignmentCreate, AssignmentUpdate, Overallocation
+from .announcement import Announcement, AnnouncementCreate
+from .calendar import CalendarStream, HeatmapGroupBy, Heatmap
\ No newline at end of file
@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import datetime
 
 from pydantic import BaseModel
 
@@ -19,6 +19,7 @@ class AnnouncementCreate(AnnouncementBase):
 class AnnouncementInDBBase(AnnouncementBase):
     id: int | None = None
     user_id: int | None = None
+    date: datetime | None = None
 
 
 # Properties to return via API
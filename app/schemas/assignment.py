@@ -32,4 +32,13 @@ class AssignmentInDBBase(AssignmentBase):
 
 # Properties to return via API
 class Assignment(AssignmentInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+
+# Collaborator booked on overlapping assignments
+class Overallocation(BaseModel):
+    collaborator_id: int
+    conflicts: int
+    overlap_days: int
+    first_overlap: date
+    last_overlap: date
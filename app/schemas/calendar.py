@@ -0,0 +1,29 @@
+from enum import Enum
+from datetime import date
+
+from pydantic import BaseModel
+
+
+# Formats available to stream the calendar instead of returning it at once
+class CalendarStream(str, Enum):
+    NDJSON = "ndjson"
+
+
+# Ways to split the occupancy heatmap
+class HeatmapGroupBy(str, Enum):
+    JOB = "job"
+    PROJECT = "project"
+
+
+# Headcount per day of one job/project (or of the whole organization)
+class HeatmapSeries(BaseModel):
+    id: int | None = None
+    headcount: list[int]
+
+
+# Properties to return via API
+class Heatmap(BaseModel):
+    start_date: date
+    final_date: date
+    group_by: HeatmapGroupBy | None = None
+    series: list[HeatmapSeries]
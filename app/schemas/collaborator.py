@@ -1,4 +1,5 @@
 from enum import Enum
+from datetime import date
 
 from pydantic import BaseModel
 
@@ -7,6 +8,11 @@ class Genders(str, Enum):
     MALE = "MALE"
     FEMALE = "FEMALE"
 
+
+class AvailabilityEncoding(str, Enum):
+    BITS = "bits"
+    RUNS = "runs"
+
 # Shared properties
 class CollaboratorBase(BaseModel):
     name: str | None = None
@@ -36,4 +42,31 @@ class CollaboratorInDBBase(CollaboratorBase):
 
 # Properties to return via API
 class Collaborator(CollaboratorInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+
+# Earliest free window of a collaborator
+class CollaboratorFreeWindow(BaseModel):
+    id: int
+    name: str
+    last_name: str
+    start_date: date
+    final_date: date | None = None
+
+
+# Availability of a collaborator in a date range, one of the two encodings
+class CollaboratorAvailability(BaseModel):
+    id: int
+    name: str
+    last_name: str
+    bits: str | None = None
+    free_runs: list[tuple[int, int]] | None = None
+
+
+# Collaborator x day availability grid
+class AvailabilityMatrix(BaseModel):
+    start_date: date
+    final_date: date
+    days: int
+    encoding: AvailabilityEncoding
+    collaborators: list[CollaboratorAvailability]
@@ -31,4 +31,10 @@ class ProjectInDBBase(ProjectBase):
 class Project(ProjectInDBBase):
     pass
 
-    
\ No newline at end of file
+    
+
+# Outcome of a bulk membership change for one collaborator: "added",
+# "already_member", "removed", "not_member" or "not_found"
+class MembershipResult(BaseModel):
+    collaborator_id: int
+    status: str
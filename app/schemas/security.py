@@ -4,7 +4,16 @@ from pydantic import BaseModel
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: str | None = None
+
+
+class RefreshTokenIn(BaseModel):
+    refresh_token: str
 
 
 class TokenData(BaseModel):
-    username: str | None = None
\ No newline at end of file
+    username: str | None = None
+    # Claims of the "stateless" auth mode
+    uid: int | None = None
+    role: str | None = None
+    ver: str | None = None
\ No newline at end of file
@@ -3,6 +3,12 @@ import os
 import pytest
 
 os.environ["FASTAPI_CONFIG"] = "testing"  # noqa
+# The app connects to DATABASE_URL, point it to the test database
+if os.environ.get("DATABASE_TEST_URL"):  # noqa
+    os.environ["DATABASE_URL"] = os.environ["DATABASE_TEST_URL"]
+
+CLEVEL_USERNAME = "guane"
+CLEVEL_PASSWORD = "ironparadise16"
 
 
 @pytest.fixture
@@ -25,4 +31,82 @@ def app(settings):
 def client(app):
     from fastapi.testclient import TestClient
 
-    yield TestClient(app)
\ No newline at end of file
+    yield TestClient(app)
+
+
+async def empty_tables():
+    from tortoise import Tortoise, connections
+
+    tables = ", ".join(
+        f'"{model._meta.db_table}"'
+        for model in Tortoise.apps["models"].values()
+    )
+    await connections.get("default").execute_script(
+        f"TRUNCATE {tables} RESTART IDENTITY CASCADE"
+    )
+
+
+async def create_clevel_user():
+    from app.core.security.pwd import password_hash
+    from app.models.department import Department
+    from app.models.user import User
+
+    department = await Department.create(name="Development", description="")
+    await User.create(
+        username=CLEVEL_USERNAME,
+        password=await password_hash(CLEVEL_PASSWORD),
+        role="C-LEVEL",
+        email="guane@example.com",
+        department_id=department.id
+    )
+
+
+@pytest.fixture()
+def db_client(settings, app):
+    """Client of the app started against the test database, with every
+    table empty. Skipped when DATABASE_TEST_URL is not set. Coroutines
+    run on the loop of the app with "db_client.portal.call".
+    """
+    if not settings.DATABASE_URL:
+        pytest.skip("DATABASE_TEST_URL is not set")
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        client.portal.call(empty_tables)
+        yield client
+
+
+@pytest.fixture()
+def clevel_client(db_client):
+    "db_client logged in as a C-LEVEL user."
+    db_client.portal.call(create_clevel_user)
+    response = db_client.post(
+        "/api/login/",
+        data={"username": CLEVEL_USERNAME, "password": CLEVEL_PASSWORD}
+    )
+    token = response.json()["access_token"]
+    db_client.headers.update({"Authorization": f"Bearer {token}"})
+    return db_client
+
+
+@pytest.fixture()
+def query_counter(monkeypatch):
+    "SQL statements sent to the database while the test runs."
+    from tortoise.backends.asyncpg.client import AsyncpgDBClient
+
+    queries = []
+    for name in (
+        "execute_query",
+        "execute_query_dict",
+        "execute_insert",
+        "execute_many",
+        "execute_script"
+    ):
+        method = getattr(AsyncpgDBClient, name)
+
+        async def counted(self, query, *args, method=method, **kwargs):
+            queries.append(query)
+            return await method(self, query, *args, **kwargs)
+
+        monkeypatch.setattr(AsyncpgDBClient, name, counted)
+    return queries
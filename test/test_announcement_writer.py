@@ -0,0 +1,99 @@
+from app.internal.announcement_writer import AnnouncementWriter
+
+
+def writer(coalesce_window: float = 10) -> AnnouncementWriter:
+    return AnnouncementWriter(
+        None,
+        batch_size=10,
+        flush_interval=1,
+        max_queued=10,
+        coalesce_window=coalesce_window
+    )
+
+
+def event(collaborators: dict, project_id: int = 1, user_id: int = 1) -> dict:
+    return {
+        "username": f"user {user_id}",
+        "user_id": user_id,
+        "project_id": project_id,
+        "collaborators": collaborators
+    }
+
+
+def test_changes_within_the_window_are_gathered():
+    announcements = writer()
+
+    announcements.coalesce(event({1: "added"}), now=0)
+    announcements.coalesce(event({2: "added", 3: "removed"}), now=4)
+
+    assert announcements.due_changes(now=9.9) == []
+    [changes] = announcements.due_changes(now=10)
+    assert changes["collaborators"] == {1: "added", 2: "added", 3: "removed"}
+    assert changes["due"] == 10
+    assert announcements.due_changes() == []
+
+
+def test_undone_change_cancels_the_pending_one():
+    announcements = writer()
+
+    announcements.coalesce(event({1: "added", 2: "added"}), now=0)
+    announcements.coalesce(event({1: "removed"}), now=1)
+    announcements.coalesce(event({2: "added"}), now=2)
+
+    [changes] = announcements.due_changes()
+    assert changes["collaborators"] == {2: "added"}
+
+
+def test_changes_are_gathered_per_user_and_project():
+    announcements = writer()
+
+    announcements.coalesce(event({1: "added"}), now=0)
+    announcements.coalesce(event({1: "removed"}, project_id=2), now=1)
+    announcements.coalesce(event({1: "removed"}, user_id=2), now=2)
+
+    changes = announcements.due_changes()
+    assert [(c["user_id"], c["project_id"], c["collaborators"]) for c in changes]\
+        == [(1, 1, {1: "added"}), (1, 2, {1: "removed"}), (2, 1, {1: "removed"})]
+
+
+def test_without_window_every_event_is_announced():
+    announcements = writer(coalesce_window=0)
+
+    announcements.coalesce(event({1: "added"}), now=0)
+    announcements.coalesce(event({1: "removed"}), now=0)
+
+    changes = announcements.due_changes(now=0)
+    assert [c["collaborators"] for c in changes]\
+        == [{1: "added"}, {1: "removed"}]
+
+
+def test_events_are_not_modified():
+    announcements = writer()
+    first = event({1: "added"})
+
+    announcements.coalesce(first, now=0)
+    announcements.coalesce(event({1: "removed"}), now=1)
+
+    assert first["collaborators"] == {1: "added"}
+
+
+def test_failed_announcement_does_not_fail_the_change(caplog):
+    import asyncio
+    from types import SimpleNamespace
+
+    async def execute_query_dict(*args):
+        raise ConnectionError("database is down")
+
+    db = SimpleNamespace(execute_query_dict=execute_query_dict)
+    crud = SimpleNamespace(model=SimpleNamespace(_meta=SimpleNamespace(db=db)))
+    announcements = writer()
+    announcements.crud = crud
+
+    asyncio.run(announcements.submit_many(
+        {"username": "user 1", "id": 1},
+        1,
+        [1, 2],
+        "added"
+    ))
+
+    assert "Could not write 1 announcement" in caplog.text
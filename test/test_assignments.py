@@ -0,0 +1,234 @@
+import random
+from datetime import date, timedelta
+
+
+async def create_staff(collaborators: int) -> None:
+    "A project with 'collaborators' members, all of them in one job."
+    from app.models.collaborator import Collaborator
+    from app.models.department import Department
+    from app.models.job import Job
+    from app.models.project import Project
+    from app.models.project_collaborator import ProjectCollaboratorModel
+
+    department = await Department.create(name="department", description="")
+    job = await Job.create(name="job", description="", department_id=department.id)
+    project = await Project.create(
+        name="project",
+        description="",
+        customer="",
+        start_date=date(2023, 1, 1),
+        final_date=date(2023, 12, 31)
+    )
+    for i in range(collaborators):
+        collaborator = await Collaborator.create(
+            name=f"name {i}",
+            last_name="last name",
+            gender="FEMALE",
+            age=30,
+            job_id=job.id
+        )
+        await ProjectCollaboratorModel.create(
+            project_id=project.id,
+            collaborator_id=collaborator.id
+        )
+
+
+async def create_assignments(assignments: list[tuple[int, date, date]]):
+    "Assignments (collaborator_id, start_date, final_date), unchecked."
+    from app.models.assignment import Assignment
+
+    await Assignment.bulk_create([
+        Assignment(
+            name="assignment",
+            start_date=start_date,
+            final_date=final_date,
+            collaborator_id=collaborator_id,
+            project_id=1
+        )
+        for collaborator_id, start_date, final_date in assignments
+    ])
+
+
+async def overallocation_report() -> list[dict]:
+    from app.internal import assignment
+
+    return [report async for report in assignment.overallocation_report()]
+
+
+def expected_report(assignments: list[tuple[int, date, date]]) -> list[dict]:
+    "Overallocation report built day by day."
+    reports = []
+    for collaborator_id in sorted({a[0] for a in assignments}):
+        booked = sorted(
+            (start_date, final_date)
+            for a_collaborator_id, start_date, final_date in assignments
+            if a_collaborator_id == collaborator_id
+        )
+        conflicts = sum(
+            1 for i, (start_date, _) in enumerate(booked)
+            if any(start_date <= final_date for _, final_date in booked[:i])
+        )
+        days = {}
+        for start_date, final_date in booked:
+            for n in range((final_date - start_date).days + 1):
+                day = start_date + timedelta(days=n)
+                days[day] = days.get(day, 0) + 1
+        overlaps = sorted(day for day, count in days.items() if count > 1)
+        if conflicts:
+            reports.append({
+                "collaborator_id": collaborator_id,
+                "conflicts": conflicts,
+                "overlap_days": len(overlaps),
+                "first_overlap": overlaps[0],
+                "last_overlap": overlaps[-1]
+            })
+    return reports
+
+
+def test_overallocation_report_matches_brute_force(db_client):
+    rng = random.Random(0)
+    assignments = []
+    for _ in range(200):
+        start_date = date(2023, 1, 1) + timedelta(days=rng.randrange(120))
+        final_date = start_date + timedelta(days=rng.randrange(10))
+        assignments.append((rng.randint(1, 8), start_date, final_date))
+    db_client.portal.call(create_staff, 8)
+    db_client.portal.call(create_assignments, assignments)
+
+    report = db_client.portal.call(overallocation_report)
+
+    assert report == expected_report(assignments)
+
+
+def assignment_in(collaborator_id: int, start_date: date, days: int) -> dict:
+    return {
+        "name": "assignment",
+        "start_date": start_date.isoformat(),
+        "final_date": (start_date + timedelta(days=days)).isoformat(),
+        "collaborator_id": collaborator_id,
+        "project_id": 1
+    }
+
+
+def test_bulk_create_reports_each_rejected_assignment(clevel_client):
+    clevel_client.portal.call(create_staff, 2)
+    clevel_client.portal.call(
+        create_assignments,
+        [(1, date(2023, 3, 1), date(2023, 3, 10))]
+    )
+
+    response = clevel_client.post("/api/assignments/bulk", json=[
+        assignment_in(2, date(2023, 3, 1), 3),
+        # Overlaps the stored assignment of collaborator 1
+        assignment_in(1, date(2023, 3, 5), 2),
+        # Overlaps the first one of the batch
+        assignment_in(2, date(2023, 3, 3), 3),
+        assignment_in(2, date(2023, 4, 1), 3),
+        # Not a member of the project
+        assignment_in(99, date(2023, 5, 1), 1),
+    ])
+
+    assert response.status_code == 409
+    conflicts = response.json()["detail"]["conflicts"]
+    assert [conflict["index"] for conflict in conflicts] == [0, 1, 2, 4]
+    assert [c["start_date"] for c in conflicts[1]["conflicts"]] == ["2023-03-01"]
+    assert [c["start_date"] for c in conflicts[2]["conflicts"]] == ["2023-03-01"]
+    assert conflicts[3]["detail"] == "The collaborator is not assigned to the project"
+    assert clevel_client.get("/api/assignments/").json()[-1]["id"] == 1
+
+
+def test_bulk_create_without_conflicts(clevel_client):
+    clevel_client.portal.call(create_staff, 2)
+
+    response = clevel_client.post("/api/assignments/bulk", json=[
+        assignment_in(1, date(2023, 3, 1), 3),
+        assignment_in(1, date(2023, 3, 5), 3),
+        assignment_in(2, date(2023, 3, 1), 3),
+    ])
+
+    assert response.status_code == 201
+    assert [a["id"] for a in response.json()] == [1, 2, 3]
+
+
+async def create_concurrently(batches: list[list[dict]]) -> list:
+    import asyncio
+
+    from app.internal import assignment
+    from app.schemas import AssignmentCreate
+
+    return await asyncio.gather(
+        *(
+            assignment.create_bulk([AssignmentCreate(**a) for a in batch])
+            for batch in batches
+        ),
+        return_exceptions=True
+    )
+
+
+def test_concurrent_bulk_creates_do_not_double_book(db_client):
+    from app.internal.assignment_crud import AssignmentOverlap
+
+    db_client.portal.call(create_staff, 1)
+    for day in range(0, 100, 10):
+        start_date = date(2023, 3, 1) + timedelta(days=day)
+
+        results = db_client.portal.call(create_concurrently, [
+            [assignment_in(1, start_date, 2)],
+            [assignment_in(1, start_date + timedelta(days=1), 2)],
+        ])
+
+        assert sorted(isinstance(r, AssignmentOverlap) for r in results)\
+            == [False, True]
+
+
+async def update_while_reading(crud_class) -> list:
+    """
+    Update the start date of assignment 1 while another update_bulk moves
+    it, once the first one has read the assignments.
+    """
+    import asyncio
+
+    from app.internal import assignment
+
+    lock_collaborators = crud_class.lock_collaborators
+    read = asyncio.Event()
+
+    async def lock_after_read(collaborator_ids):
+        if not read.is_set():
+            read.set()
+            # Give the other update the chance to commit in between
+            await asyncio.sleep(0.3)
+        await lock_collaborators(collaborator_ids)
+
+    async def move():
+        await read.wait()
+        return await assignment.update_bulk(
+            [1],
+            {"start_date": date(2023, 3, 13), "final_date": date(2023, 3, 20)}
+        )
+
+    crud_class.lock_collaborators = staticmethod(lock_after_read)
+    try:
+        return await asyncio.gather(
+            assignment.update_bulk([1], {"start_date": date(2023, 3, 2)}),
+            move(),
+            return_exceptions=True
+        )
+    finally:
+        crud_class.lock_collaborators = staticmethod(lock_collaborators)
+
+
+def test_bulk_update_checks_the_rows_it_locked(db_client):
+    from app.internal.assignment_crud import CRUDAssignment
+
+    db_client.portal.call(create_staff, 1)
+    db_client.portal.call(create_assignments, [
+        (1, date(2023, 3, 1), date(2023, 3, 3)),
+        (1, date(2023, 3, 10), date(2023, 3, 12)),
+    ])
+
+    results = db_client.portal.call(update_while_reading, CRUDAssignment)
+
+    # The move waits for the first update, so both go through
+    assert not [r for r in results if isinstance(r, Exception)]
+    assert db_client.portal.call(overallocation_report) == []
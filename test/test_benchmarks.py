@@ -0,0 +1,112 @@
+import statistics
+import time
+
+
+def latencies(client, url: str, requests: int) -> list[float]:
+    "Seconds taken by each of 'requests' sequential GET requests."
+    times = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(url)
+        times.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    return times
+
+
+def summary(times: list[float]) -> dict:
+    "Median, p90 and p99 in milliseconds."
+    cuts = statistics.quantiles(times, n=100)
+    return {
+        "median_ms": round(statistics.median(times) * 1000, 2),
+        "p90_ms": round(cuts[89] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2)
+    }
+
+
+def test_principal_cache_benchmark(
+    clevel_client,
+    query_counter,
+    monkeypatch,
+    record_property
+):
+    """GET /api/projects/count without and with the principal cache. The
+    latencies are recorded with "record_property", run with
+    "--junitxml=report.xml" to read them.
+    """
+    from app.core.cache import TTLCache
+    from app.internal import user
+
+    results = {}
+    for name, cache in (
+        ("without cache", None),
+        ("with cache", TTLCache("user", 1024, ttl=5))
+    ):
+        monkeypatch.setattr(user, "cache", cache)
+        latencies(clevel_client, "/api/projects/count", 20)
+        query_counter.clear()
+        times = latencies(clevel_client, "/api/projects/count", 500)
+        results[name] = {
+            "queries_per_request": len(query_counter) / len(times),
+            **summary(times)
+        }
+        record_property(name, results[name])
+
+    assert results["without cache"]["queries_per_request"] == 2
+    assert results["with cache"]["queries_per_request"] == 1
+
+
+def login(client) -> None:
+    from conftest import CLEVEL_PASSWORD, CLEVEL_USERNAME
+
+    response = client.post(
+        "/api/login/",
+        data={"username": CLEVEL_USERNAME, "password": CLEVEL_PASSWORD}
+    )
+    assert response.status_code == 200
+
+
+def test_latency_during_concurrent_logins(clevel_client, record_property):
+    """p99 of GET /api/projects/count alone and while other clients log in
+    nonstop. The bcrypt checks of the logins run on the hashing pool, so
+    they must not hold the event loop. The latencies are recorded with
+    "record_property", run with "--junitxml=report.xml" to read them.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from threading import Event
+
+    start = time.perf_counter()
+    login(clevel_client)
+    login_seconds = time.perf_counter() - start
+
+    latencies(clevel_client, "/api/projects/count", 20)
+    idle = summary(latencies(clevel_client, "/api/projects/count", 300))
+
+    stop = Event()
+
+    def log_in_until_stopped() -> int:
+        logins = 0
+        while not stop.is_set():
+            login(clevel_client)
+            logins += 1
+        return logins
+
+    with ThreadPoolExecutor(4) as pool:
+        workers = [pool.submit(log_in_until_stopped) for _ in range(4)]
+        try:
+            loaded = summary(latencies(clevel_client, "/api/projects/count", 300))
+        finally:
+            stop.set()
+        logins = sum(worker.result() for worker in workers)
+
+    results = {
+        "login_ms": round(login_seconds * 1000, 2),
+        "logins": logins,
+        "idle": idle,
+        "during logins": loaded
+    }
+    record_property("concurrent logins", results)
+
+    assert logins >= 4
+    # A bcrypt check run on the loop would stall some requests for a whole
+    # login
+    assert loaded["p99_ms"] < login_seconds * 1000 / 2
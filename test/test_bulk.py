@@ -0,0 +1,25 @@
+def test_bulk_create_reports_missing_references(clevel_client):
+    response = clevel_client.post("/api/jobs/bulk", json=[
+        {"name": "Backend", "description": "", "department_id": 1},
+        {"name": "Frontend", "description": "", "department_id": 7},
+        {"name": "Data", "description": "", "department_id": 1},
+        {"name": "QA", "description": "", "department_id": 8},
+    ])
+
+    assert response.status_code == 409
+    conflicts = response.json()["detail"]["conflicts"]
+    assert [(c["index"], c["detail"]) for c in conflicts] == [
+        (1, "department_id 7 does not exist"),
+        (3, "department_id 8 does not exist")
+    ]
+    assert clevel_client.get("/api/jobs/").status_code == 400
+
+
+def test_bulk_create(clevel_client):
+    response = clevel_client.post("/api/jobs/bulk", json=[
+        {"name": "Backend", "description": "", "department_id": 1},
+        {"name": "Frontend", "description": "", "department_id": 1},
+    ])
+
+    assert response.status_code == 201
+    assert [job["name"] for job in response.json()] == ["Backend", "Frontend"]
@@ -0,0 +1,103 @@
+from datetime import date, timedelta
+
+
+async def create_projects(projects: int, jobs: int, collaborators: int):
+    """Projects with every collaborator in each one, split across "jobs",
+    and one assignment per collaborator and project, plus one outside of
+    February 2023.
+    """
+    from app.models.assignment import Assignment
+    from app.models.collaborator import Collaborator
+    from app.models.job import Job
+    from app.models.project import Project
+    from app.models.project_collaborator import ProjectCollaboratorModel
+
+    job_objs = [
+        await Job.create(name=f"job {i}", description="", department_id=1)
+        for i in range(jobs)
+    ]
+    collaborator_objs = [
+        await Collaborator.create(
+            name=f"name {i}",
+            last_name="last name",
+            gender="FEMALE",
+            age=30,
+            job_id=job_objs[i % jobs].id
+        )
+        for i in range(collaborators)
+    ]
+    for i in range(projects):
+        project = await Project.create(
+            name=f"project {i}",
+            description="",
+            customer="",
+            start_date=date(2023, 1, 1),
+            final_date=date(2023, 12, 31)
+        )
+        for j, collaborator in enumerate(collaborator_objs):
+            await ProjectCollaboratorModel.create(
+                project_id=project.id,
+                collaborator_id=collaborator.id
+            )
+            start_date = date(2023, 2, 1) + timedelta(days=j % 20)
+            await Assignment.create(
+                name="in range",
+                start_date=start_date,
+                final_date=start_date + timedelta(days=5),
+                collaborator_id=collaborator.id,
+                project_id=project.id
+            )
+            await Assignment.create(
+                name="out of range",
+                start_date=date(2023, 6, 1),
+                final_date=date(2023, 6, 5),
+                collaborator_id=collaborator.id,
+                project_id=project.id
+            )
+
+
+def calendar_queries(client, query_counter) -> tuple[int, list]:
+    query_counter.clear()
+    response = client.get("/api/calendar/2023-02-01/2023-02-28")
+    assert response.status_code == 200
+    return len(query_counter), response.json()
+
+
+def test_calendar_query_count_is_constant(clevel_client, query_counter):
+    clevel_client.portal.call(create_projects, 1, 1, 2)
+    small_count, small = calendar_queries(clevel_client, query_counter)
+
+    clevel_client.portal.call(create_projects, 4, 3, 12)
+    large_count, large = calendar_queries(clevel_client, query_counter)
+
+    assert len(large) == len(small) + 4
+    assert large_count == small_count
+
+
+async def create_idle_collaborator():
+    "Collaborator of the first job without assignments."
+    from app.models.collaborator import Collaborator
+
+    await Collaborator.create(
+        name="idle",
+        last_name="last name",
+        gender="MALE",
+        age=30,
+        job_id=1
+    )
+
+
+def test_calendar_lists_every_assignment_in_the_project(clevel_client):
+    clevel_client.portal.call(create_projects, 1, 1, 2)
+    clevel_client.portal.call(create_idle_collaborator)
+
+    [project] = clevel_client.get("/api/calendar/2023-02-01/2023-02-28").json()
+
+    [job] = project["jobs_implicated"]
+    assert (job["start_date"], job["end_date"]) == ("2023-02-01", "2023-02-07")
+    assert [c["name"] for c in job["collaborators"]] == ["name 0", "name 1"]
+    for collaborator in job["collaborators"]:
+        assert [a["name"] for a in collaborator["assignments"]] == [
+            "in range",
+            "out of range"
+        ]
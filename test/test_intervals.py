@@ -0,0 +1,65 @@
+from datetime import date
+
+import numpy as np
+
+from app.internal.intervals import to_day_numbers, merge_intervals, daily_counts
+
+
+def random_intervals(rng, n: int, keys: int = 5, days: int = 60):
+    starts = rng.integers(0, days, n)
+    finals = starts + rng.integers(0, 15, n)
+    return rng.integers(0, keys, n), starts, finals
+
+
+def days_by_key(keys, starts, finals) -> dict[int, set[int]]:
+    covered = {}
+    for key, start, final in zip(keys, starts, finals):
+        covered.setdefault(int(key), set()).update(range(start, final + 1))
+    return covered
+
+
+def test_to_day_numbers():
+    assert to_day_numbers([date(1970, 1, 1), date(1970, 1, 31)]).tolist() == [0, 30]
+
+
+def test_merge_intervals_matches_brute_force():
+    rng = np.random.default_rng(0)
+    for n in (0, 1, 2, 10, 200):
+        keys, starts, finals = random_intervals(rng, n)
+        merged_keys, merged_starts, merged_finals = merge_intervals(
+            keys,
+            starts,
+            finals
+        )
+
+        assert days_by_key(merged_keys, merged_starts, merged_finals)\
+            == days_by_key(keys, starts, finals)
+        # Sorted by key and start, without overlapping intervals of the
+        # same key
+        for i in range(1, len(merged_keys)):
+            assert (merged_keys[i - 1], merged_starts[i - 1])\
+                < (merged_keys[i], merged_starts[i])
+            if merged_keys[i - 1] == merged_keys[i]:
+                assert merged_finals[i - 1] < merged_starts[i]
+
+
+def test_daily_counts_matches_brute_force():
+    rng = np.random.default_rng(1)
+    groups, starts, finals = random_intervals(rng, 300, keys=3, days=90)
+    first_day, last_day = 20, 70
+
+    counts = daily_counts(groups, starts, finals, first_day, last_day, 3)
+
+    expected = np.zeros((3, last_day - first_day + 1), dtype=np.int64)
+    for group, start, final in zip(groups, starts, finals):
+        for day in range(max(start, first_day), min(final, last_day) + 1):
+            expected[group, day - first_day] += 1
+    assert counts.tolist() == expected.tolist()
+
+
+def test_daily_counts_without_intervals():
+    empty = np.array([], dtype=np.int64)
+
+    counts = daily_counts(empty, empty, empty, 0, 6, 2)
+
+    assert counts.tolist() == [[0] * 7, [0] * 7]
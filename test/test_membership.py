@@ -0,0 +1,40 @@
+import pytest
+
+from test_assignments import create_staff
+
+
+def test_membership_changes_report_each_collaborator(clevel_client):
+    clevel_client.portal.call(create_staff, 2)
+
+    removed = clevel_client.delete(
+        "/api/projects/1/collaborators",
+        params={"ids": [2, 3]}
+    )
+    added = clevel_client.post(
+        "/api/projects/1/collaborators",
+        params={"ids": [1, 2, 3]}
+    )
+
+    assert removed.status_code == 200
+    assert removed.json() == [
+        {"collaborator_id": 2, "status": "removed"},
+        {"collaborator_id": 3, "status": "not_member"}
+    ]
+    assert added.status_code == 200
+    assert added.json() == [
+        {"collaborator_id": 1, "status": "already_member"},
+        {"collaborator_id": 2, "status": "added"},
+        {"collaborator_id": 3, "status": "not_found"}
+    ]
+
+
+@pytest.mark.parametrize("method", ["post", "delete"])
+def test_membership_of_a_missing_project(clevel_client, method):
+    response = clevel_client.request(
+        method,
+        "/api/projects/7/collaborators",
+        params={"ids": [1]}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Project with id:7 not found"
@@ -0,0 +1,75 @@
+import base64
+from datetime import date
+
+import pytest
+
+from app.internal.CRUD.query_params import (
+    InvalidQueryParam,
+    encode_cursor,
+    decode_cursor
+)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor([date(2023, 2, 13), 7])
+
+    assert decode_cursor(cursor) == ["2023-02-13", 7]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(b'{"a": 1}').decode(),
+    base64.urlsafe_b64encode(b"[1, 2, 3]").decode(),
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidQueryParam):
+        decode_cursor(cursor)
+
+
+async def create_departments(names: list[str]):
+    from app.models.department import Department
+
+    for name in names:
+        await Department.create(name=name, description="A long description")
+
+
+def read_pages(client, url: str, **params) -> list[dict]:
+    "Every entry of a list route, following the X-Next-Cursor headers."
+    entries = []
+    while True:
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        entries += response.json()
+        if "X-Next-Cursor" not in response.headers:
+            return entries
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+
+def test_pages_sorted_by_a_column(clevel_client):
+    names = ["delta", "alpha", "charlie", "alpha", "bravo", "echo", "bravo"]
+    clevel_client.portal.call(create_departments, names)
+
+    departments = read_pages(
+        clevel_client,
+        "/api/deparments/",
+        limit=2,
+        order_by="name"
+    )
+
+    assert departments == sorted(
+        clevel_client.get("/api/deparments/").json(),
+        key=lambda department: (department["name"], department["id"])
+    )
+
+
+@pytest.mark.parametrize("url", [
+    "/api/users/?order_by=password",
+    "/api/deparments/?order_by=description",
+    "/api/users/?fields=password",
+    "/api/users/1?fields=username,password",
+])
+def test_hidden_columns_are_rejected(clevel_client, url):
+    response = clevel_client.get(url)
+
+    assert response.status_code == 400
@@ -0,0 +1,37 @@
+import asyncio
+import threading
+
+from app.core.security.pwd import HashingExecutor
+
+
+def test_run_returns_the_result():
+    executor = HashingExecutor(2)
+
+    async def run_all():
+        return await asyncio.gather(*(executor.run(pow, n, 2) for n in range(5)))
+
+    assert asyncio.run(run_all()) == [0, 1, 4, 9, 16]
+    stats = executor.stats()
+    assert (stats["queued"], stats["running"], stats["completed"]) == (0, 0, 5)
+
+
+def test_cancelled_call_leaves_the_queue():
+    executor = HashingExecutor(1)
+    release = threading.Event()
+
+    async def cancel_queued():
+        busy = asyncio.create_task(executor.run(release.wait, 5))
+        queued = asyncio.create_task(executor.run(pow, 2, 2))
+        await asyncio.sleep(0.05)
+        assert executor.stats()["queued"] == 1
+
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        assert executor.stats()["queued"] == 0
+
+        release.set()
+        await busy
+
+    asyncio.run(cancel_queued())
+    stats = executor.stats()
+    assert (stats["queued"], stats["running"], stats["completed"]) == (0, 0, 1)
@@ -0,0 +1,39 @@
+from conftest import CLEVEL_PASSWORD, CLEVEL_USERNAME
+
+
+def test_user_writes_update_the_token_versions(
+    clevel_client,
+    query_counter,
+    monkeypatch
+):
+    from app.config import settings
+    from app.core.security.revocation import token_versions
+
+    monkeypatch.setattr(settings, "AUTH_MODE", "stateless")
+    clevel_client.portal.call(token_versions.load)
+    response = clevel_client.post(
+        "/api/login/",
+        data={"username": CLEVEL_USERNAME, "password": CLEVEL_PASSWORD}
+    )
+    clevel_client.headers["Authorization"] = \
+        f'Bearer {response.json()["access_token"]}'
+
+    response = clevel_client.post("/api/users/", json={
+        "username": "daniel_17",
+        "password": "a long password",
+        "role": "LEADER",
+        "email": "daniel@guane.com.co",
+        "department_id": 1
+    })
+    assert response.status_code == 201
+    query_counter.clear()
+
+    # Served from the versions in memory, without reading the users
+    assert clevel_client.get("/api/projects/count").status_code == 200
+    assert not [query for query in query_counter if '"user_db"' in query]
+
+    response = clevel_client.patch("/api/users/1", json={"role": "LEADER"})
+    assert response.status_code == 200
+
+    # The tokens issued before the new role are revoked right away
+    assert clevel_client.get("/api/projects/count").status_code == 401